@@ -759,16 +759,25 @@ def rowwise_adagrad_with_counter() -> Dict[str, Any]:
     if (is_tail_id_thresh_ratio == 1){
         tail_id_threshold_val = floorf(tail_id_threshold * max_counter);
     }
-    if (counter_halflife > 0 && threadIdx.x == 0) {
-        // if id occurs multiple times in a batch, iter_delta=1
-        const auto iter_delta = prev_iter[idx] == 0 ? 1.0 : iter * 1.0 - prev_iter[idx];
-        prev_iter[idx] = iter * 1.0;
-        const auto counter_log_rho = logf(2.0) / counter_halflife;
-        row_counter[idx] = 1.0 + expf(-iter_delta * counter_log_rho) * row_counter[idx];
-        freq = counter_halflife / row_counter[idx];
-        if (weight_decay_mode == 1) {
-            // L2 regularization
-            l2_wd = 1.0;
+    // row_counter and prev_iter are only accessed by the leader thread. Keep
+    // the row counter in a register so that it is read from and written to
+    // global memory at most once per row update.
+    at::acc_type<cache_t, true> row_counter_val = 0.0;
+    if (threadIdx.x == 0) {
+        row_counter_val = row_counter[idx];
+        if (counter_halflife > 0) {
+            // if id occurs multiple times in a batch, iter_delta=1
+            const auto prev_iter_val = prev_iter[idx];
+            const auto iter_delta = prev_iter_val == 0 ? 1.0 : iter * 1.0 - prev_iter_val;
+            prev_iter[idx] = iter * 1.0;
+            const auto counter_log_rho = logf(2.0) / counter_halflife;
+            row_counter_val = 1.0 + expf(-iter_delta * counter_log_rho) * row_counter_val;
+            row_counter[idx] = row_counter_val;
+            freq = counter_halflife / row_counter_val;
+            if (weight_decay_mode == 1) {
+                // L2 regularization
+                l2_wd = 1.0;
+            }
         }
     }
     freq = SHFL_SYNC(freq, 0);
@@ -806,13 +815,13 @@ def rowwise_adagrad_with_counter() -> Dict[str, Any]:
         if ( learning_rate_mode >=0 ) {
             if (adjustment_iter <= 0 || (adjustment_iter > 0 && iter > adjustment_iter)) {
 
-                if (row_counter[idx] > tail_id_threshold_val) {
+                if (row_counter_val > tail_id_threshold_val) {
                     if ( learning_rate_mode == 0 ) {
-                        adjusted_multiplier = multiplier * max(min(powf(max_counter/(row_counter[idx] + 1.0), adjustment_ub), 10.0), 1.0);
+                        adjusted_multiplier = multiplier * max(min(powf(max_counter/(row_counter_val + 1.0), adjustment_ub), 10.0), 1.0);
                     } else if ( learning_rate_mode == 1 ) {
-                        adjusted_multiplier = multiplier * min(max(powf((row_counter[idx] + 1.0)/max_counter, adjustment_ub), 0.1), 1.0);
+                        adjusted_multiplier = multiplier * min(max(powf((row_counter_val + 1.0)/max_counter, adjustment_ub), 0.1), 1.0);
                     } else if (learning_rate_mode == 2) {
-                        adjusted_multiplier = learning_rate / (sqrtf(adjustment_ub*row_counter[idx]) + eps);
+                        adjusted_multiplier = learning_rate / (sqrtf(adjustment_ub*row_counter_val) + eps);
                     }
                 }
             }
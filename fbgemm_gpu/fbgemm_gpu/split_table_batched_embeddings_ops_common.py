@@ -9,7 +9,7 @@
 
 import enum
 from dataclasses import dataclass
-from typing import List, NamedTuple
+from typing import List, NamedTuple, Tuple
 
 
 # Maximum number of times prefetch() can be called without
@@ -75,34 +75,51 @@ class CacheState:
     total_cache_hash_size: int
 
 
-def construct_cache_state(
+def construct_cache_hash_size_cumsum(
     row_list: List[int],
     location_list: List[EmbeddingLocation],
     feature_table_map: List[int],
-) -> CacheState:
-    _cache_hash_size_cumsum = [0]
+) -> Tuple[List[int], List[int], List[int]]:
+    """
+    Returns the per-table cumsum of the cached rows ([T_ + 1]), the per-feature
+    cache_hash_size_cumsum ([T + 1], -1: non-cached table) and the last feature
+    of each table ([T_], -1: table without features).
+    """
+    table_cache_hash_size_cumsum = [0]
     total_cache_hash_size = 0
     for num_embeddings, location in zip(row_list, location_list):
         if location == EmbeddingLocation.MANAGED_CACHING:
             total_cache_hash_size += num_embeddings
-        _cache_hash_size_cumsum.append(total_cache_hash_size)
-    # [T], -1: non-cached table
-    cache_hash_size_cumsum = []
-    # [total_cache_hash_size], linear cache index -> table index
-    cache_index_table_map = [-1] * total_cache_hash_size
-    unique_feature_table_map = {}
-    for t, t_ in enumerate(feature_table_map):
-        unique_feature_table_map[t_] = t
-    for t_, t in unique_feature_table_map.items():
-        start, end = _cache_hash_size_cumsum[t_], _cache_hash_size_cumsum[t_ + 1]
-        cache_index_table_map[start:end] = [t] * (end - start)
+        table_cache_hash_size_cumsum.append(total_cache_hash_size)
     cache_hash_size_cumsum = [
-        _cache_hash_size_cumsum[t_]
+        table_cache_hash_size_cumsum[t_]
         if location_list[t_] == EmbeddingLocation.MANAGED_CACHING
         else -1
         for t_ in feature_table_map
     ]
     cache_hash_size_cumsum.append(total_cache_hash_size)
+    table_feature = [-1] * len(row_list)
+    for t, t_ in enumerate(feature_table_map):
+        table_feature[t_] = t
+    return table_cache_hash_size_cumsum, cache_hash_size_cumsum, table_feature
+
+
+def construct_cache_state(
+    row_list: List[int],
+    location_list: List[EmbeddingLocation],
+    feature_table_map: List[int],
+) -> CacheState:
+    (
+        _cache_hash_size_cumsum,
+        cache_hash_size_cumsum,
+        table_feature,
+    ) = construct_cache_hash_size_cumsum(row_list, location_list, feature_table_map)
+    total_cache_hash_size = cache_hash_size_cumsum[-1]
+    # [total_cache_hash_size], linear cache index -> table index
+    cache_index_table_map = [-1] * total_cache_hash_size
+    for t_, t in enumerate(table_feature):
+        start, end = _cache_hash_size_cumsum[t_], _cache_hash_size_cumsum[t_ + 1]
+        cache_index_table_map[start:end] = [t] * (end - start)
     s = CacheState(
         cache_hash_size_cumsum=cache_hash_size_cumsum,
         cache_index_table_map=cache_index_table_map,
@@ -116,3 +133,7 @@ def construct_cache_state(
 # breakage with Caffe2 module_factory because it will pull in numpy
 def round_up(a: int, b: int) -> int:
     return int((a + b - 1) // b) * b
+
+
+def div_round_up(a: int, b: int) -> int:
+    return int((a + b - 1) // b)
@@ -1067,12 +1067,12 @@ class IntNBitTableBatchedEmbeddingBagsCodegen(nn.Module):
         )
         self.register_buffer(
             "lxu_cache_state",
-            torch.zeros(
-                cache_sets,
-                self.cache_assoc,
+            torch.full(
+                (cache_sets, self.cache_assoc),
+                -1,
                 device=self.current_device,
                 dtype=torch.int64,
-            ).fill_(-1),
+            ),
         )
         self.register_buffer(
             "lxu_cache_weights",
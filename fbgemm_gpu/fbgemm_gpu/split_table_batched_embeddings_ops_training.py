@@ -7,14 +7,24 @@
 
 # pyre-ignore-all-errors[56]
 
+import contextlib
 import enum
 import functools
 import logging
 import os
 from dataclasses import dataclass, field
 from itertools import accumulate
-from math import log2
-from typing import Callable, Dict, List, Optional, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 import torch  # usort:skip
 from torch import nn, Tensor  # usort:skip
@@ -24,12 +34,13 @@ from fbgemm_gpu.split_embedding_configs import EmbOptimType as OptimType, Sparse
 from fbgemm_gpu.split_table_batched_embeddings_ops_common import (
     BoundsCheckMode,
     CacheAlgorithm,
-    CacheState,
-    construct_cache_state,
+    construct_cache_hash_size_cumsum,
+    div_round_up,
     EmbeddingLocation,
     MAX_PREFETCH_DEPTH,
     PoolingMode,
     RecordCacheMetrics,
+    round_up,
     SplitState,
 )
 
@@ -108,43 +119,65 @@ def construct_split_state(
     int8_emb_row_dim_offset: int = INT8_EMB_ROW_DIM_OFFSET,
     placement: Optional[EmbeddingLocation] = None,
 ) -> SplitState:
-    placements: List[EmbeddingLocation] = []
-    offsets: List[int] = []
-    dev_size: int = 0
-    host_size: int = 0
-    uvm_size: int = 0
-    for num_embeddings, embedding_dim, location, _ in embedding_specs:
-        assert (
-            embedding_dim % 4 == 0
-        ), f"embedding_dim must be a multiple of 4, but got {embedding_dim}"
-        if precision == SparseType.INT8:
-            embedding_dim += int8_emb_row_dim_offset
-        state_size = num_embeddings * embedding_dim if not rowwise else num_embeddings
-        location = placement if placement is not None else location
-        if location == EmbeddingLocation.HOST:
-            placements.append(EmbeddingLocation.HOST)
-            offsets.append(host_size)
-            host_size += state_size
-        # If table is on device, then opimtizer is on device.
-        # If table is managed, then if optimizer state is rowwise, optimizer is on device, otherwise optimizer is managed.
-        elif location == EmbeddingLocation.DEVICE or rowwise:
-            placements.append(EmbeddingLocation.DEVICE)
-            offsets.append(dev_size)
-            dev_size += state_size
-        else:
-            if cacheable and location == EmbeddingLocation.MANAGED_CACHING:
-                placements.append(EmbeddingLocation.MANAGED_CACHING)
-            else:
-                placements.append(EmbeddingLocation.MANAGED)
-            offsets.append(uvm_size)
-            uvm_size += state_size
-    assert len(placements) == len(offsets)
+    # NOTE: the placements/offsets are computed with vectorized CPU tensor ops
+    # (one masked exclusive cumsum per memory location) instead of a Python
+    # loop over the tables
+    num_embeddings = torch.tensor(
+        [spec[0] for spec in embedding_specs], dtype=torch.int64
+    )
+    embedding_dims = torch.tensor(
+        [spec[1] for spec in embedding_specs], dtype=torch.int64
+    )
+    invalid_dims = embedding_dims[embedding_dims % 4 != 0]
+    assert (
+        invalid_dims.numel() == 0
+    ), f"embedding_dim must be a multiple of 4, but got {invalid_dims[0].item()}"
+    if precision == SparseType.INT8:
+        embedding_dims += int8_emb_row_dim_offset
+    state_sizes = num_embeddings if rowwise else num_embeddings * embedding_dims
+    if placement is not None:
+        locations = torch.full_like(num_embeddings, placement.value)
+    else:
+        locations = torch.tensor(
+            [int(spec[2]) for spec in embedding_specs], dtype=torch.int64
+        )
+
+    is_host = locations == EmbeddingLocation.HOST.value
+    # If table is on device, then opimtizer is on device.
+    # If table is managed, then if optimizer state is rowwise, optimizer is on device, otherwise optimizer is managed.
+    is_dev = (
+        ~is_host
+        if rowwise
+        else (~is_host & (locations == EmbeddingLocation.DEVICE.value))
+    )
+    is_uvm = ~(is_host | is_dev)
+
+    placements = torch.full_like(locations, EmbeddingLocation.MANAGED.value)
+    if cacheable:
+        placements.masked_fill_(
+            is_uvm & (locations == EmbeddingLocation.MANAGED_CACHING.value),
+            EmbeddingLocation.MANAGED_CACHING.value,
+        )
+    placements.masked_fill_(is_dev, EmbeddingLocation.DEVICE.value)
+    placements.masked_fill_(is_host, EmbeddingLocation.HOST.value)
+
+    # Each table is offset by the total state size of the preceding tables
+    # that share its location, i.e., an exclusive cumsum within the location
+    offsets = torch.zeros_like(state_sizes)
+    location_sizes: List[int] = []
+    for mask in (is_dev, is_host, is_uvm):
+        sizes = state_sizes * mask
+        cumsum = torch.cumsum(sizes, dim=0)
+        offsets += (cumsum - sizes) * mask
+        location_sizes.append(int(sizes.sum()))
+    dev_size, host_size, uvm_size = location_sizes
+
     return SplitState(
         dev_size=dev_size,
         host_size=host_size,
         uvm_size=uvm_size,
-        placements=placements,
-        offsets=offsets,
+        placements=[EmbeddingLocation(p) for p in placements.tolist()],
+        offsets=offsets.tolist(),
     )
 
 
@@ -162,20 +195,31 @@ def apply_split_helper(
     enforce_hbm: bool = False,
     make_dev_param: bool = False,
     dev_reshape: Optional[Tuple[int, ...]] = None,
+    index_tensors: Optional[Tuple[Tensor, Tensor]] = None,
 ) -> None:
     set_attr_fn(f"{prefix}_physical_placements", split.placements)
     set_attr_fn(f"{prefix}_physical_offsets", split.offsets)
 
-    offsets = [split.offsets[t] for t in feature_table_map]
-    placements = [split.placements[t] for t in feature_table_map]
-    persistent_state_fn(
-        f"{prefix}_offsets",
-        torch.tensor(offsets, device=current_device, dtype=torch.int64),
-    )
-    persistent_state_fn(
-        f"{prefix}_placements",
-        torch.tensor(placements, device=current_device, dtype=torch.int32),
-    )
+    # index_tensors: (offsets, placements) to register instead of building
+    # them from the split, e.g., copies of those of an identical split
+    if index_tensors is None:
+        feature_table_map_t = torch.tensor(feature_table_map, dtype=torch.int64)
+        offsets = torch.tensor(split.offsets, dtype=torch.int64).index_select(
+            0, feature_table_map_t
+        )
+        placements = torch.tensor(split.placements, dtype=torch.int32).index_select(
+            0, feature_table_map_t
+        )
+        if current_device.type == "cuda":
+            # Stage through pinned memory so the H2D copies don't block the host
+            index_tensors = (
+                offsets.pin_memory().to(current_device, non_blocking=True),
+                placements.pin_memory().to(current_device, non_blocking=True),
+            )
+        else:
+            index_tensors = (offsets.to(current_device), placements.to(current_device))
+    persistent_state_fn(f"{prefix}_offsets", index_tensors[0])
+    persistent_state_fn(f"{prefix}_placements", index_tensors[1])
     if split.dev_size > 0:
         dev_buffer = torch.zeros(
             split.dev_size,
@@ -259,6 +303,88 @@ def apply_split_helper(
         )
 
 
+def batched_to_device_helper(
+    tensors: List[Tensor],
+    current_device: torch.device,
+    alignment: int = 8,
+) -> List[Tensor]:
+    """
+    Copies a list of (small) host tensors to `current_device` with a single
+    non-blocking H2D copy: the tensors are packed into one pinned staging
+    buffer, each starting at a multiple of `alignment` bytes, and the returned
+    tensors are views of the device copy of that buffer.
+    """
+    if current_device.type != "cuda" or any(t.device.type != "cpu" for t in tensors):
+        return [t.to(device=current_device) for t in tensors]
+    byte_offsets: List[int] = []
+    total_bytes = 0
+    for t in tensors:
+        byte_offsets.append(total_bytes)
+        total_bytes = round_up(total_bytes + t.numel() * t.element_size(), alignment)
+    staging = torch.empty(total_bytes, dtype=torch.uint8, pin_memory=True)
+    for t, offset in zip(tensors, byte_offsets):
+        src = t.contiguous().view(-1).view(torch.uint8)
+        staging.narrow(0, offset, src.numel()).copy_(src)
+    staging = staging.to(current_device, non_blocking=True)
+    return [
+        staging.narrow(0, offset, t.numel() * t.element_size())
+        .view(t.dtype)
+        .view(t.shape)
+        for t, offset in zip(tensors, byte_offsets)
+    ]
+
+
+def construct_cache_state_tensors(
+    row_list: List[int],
+    location_list: List[EmbeddingLocation],
+    feature_table_map: List[int],
+    current_device: torch.device,
+) -> Tuple[Tensor, Tensor]:
+    """
+    Builds the cache_hash_size_cumsum (int64) and cache_index_table_map (int32)
+    tensors on `current_device`. They hold the same values as the lists of
+    construct_cache_state(), but cache_index_table_map is expanded on the device
+    from per-table inputs instead of being materialized as a
+    total_cache_hash_size-long Python list.
+    """
+    (
+        table_cache_hash_size_cumsum,
+        cache_hash_size_cumsum,
+        table_feature,
+    ) = construct_cache_hash_size_cumsum(row_list, location_list, feature_table_map)
+    total_cache_hash_size = cache_hash_size_cumsum[-1]
+    cached_rows = [
+        end - start
+        for start, end in zip(
+            table_cache_hash_size_cumsum[:-1], table_cache_hash_size_cumsum[1:]
+        )
+    ]
+    cache_hash_size_cumsum_t, table_feature_t, cached_rows_t = batched_to_device_helper(
+        [
+            torch.tensor(cache_hash_size_cumsum, dtype=torch.int64),
+            torch.tensor(table_feature, dtype=torch.int32),
+            torch.tensor(cached_rows, dtype=torch.int64),
+        ],
+        current_device,
+    )
+    return (
+        # The staged tensors are views of one buffer; give the (persistent)
+        # cache_hash_size_cumsum buffer its own storage
+        cache_hash_size_cumsum_t.clone(),
+        # output_size avoids a device-to-host sync to size the output
+        table_feature_t.repeat_interleave(
+            cached_rows_t, output_size=total_cache_hash_size
+        ),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _device_total_memory(device_index: int) -> int:
+    # Total device memory never changes, so only query the driver once per
+    # device (memory_reserved does change and is still read every time)
+    return torch.cuda.get_device_properties(device_index).total_memory
+
+
 # pyre-fixme[13]: Attribute `uvm_cache_stats` is never initialized.
 # pyre-fixme[13]: Attribute `local_uvm_cache_stats` is never initialized.
 class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
@@ -274,6 +400,7 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
 
     embedding_specs: List[Tuple[int, int, EmbeddingLocation, ComputeDevice]]
     optimizer_args: invokers.lookup_args.OptimizerArgs
+    default_vbe_metadata: invokers.lookup_args.VBEMetadata
     lxu_cache_locations_list: List[Tensor]
     lxu_cache_locations_empty: Tensor
     timesteps_prefetched: List[int]
@@ -281,6 +408,13 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
     uvm_cache_stats: torch.Tensor
     local_uvm_cache_stats: torch.Tensor
     linear_cache_indices_list: List[Tensor]
+    # Python-only caches of the @torch.jit.ignore'd split_embedding_weights()
+    # and split_optimizer_states(); TorchScript would otherwise type them as
+    # NoneType from their initial value
+    __jit_ignored_attributes__ = [
+        "_split_weights_cache",
+        "_split_optimizer_states_cache",
+    ]
 
     def __init__(  # noqa C901
         self,
@@ -329,6 +463,18 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         # If a separate stream is used for prefetch, the optional forward_stream arg of prefetch function
         # should be set.
         prefetch_pipeline: bool = False,
+        # set to True to place the LFU cache state (one counter per row of all
+        # cached tables) on managed (UVM) memory instead of HBM
+        managed_lxu_state: bool = False,
+        # set to True to keep (halved) LFU access counts across
+        # reset_cache_states() instead of discarding them, so that rows are
+        # re-admitted by their access history after a reset
+        keep_lfu_history: bool = False,
+        # optional torch.cuda.MemPool to allocate the long-lived cache buffers
+        # from, isolating them from transient per-step allocations. The caller
+        # owns the pool. NOTE: the caching allocator does not use expandable
+        # segments for private pools.
+        cache_mem_pool: Optional[Any] = None,
     ) -> None:
         super(SplitTableBatchedEmbeddingBagsCodegen, self).__init__()
 
@@ -341,6 +487,9 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         ), "Only LRU cache policy supports prefetch_pipeline."
         self.prefetch_pipeline: bool = prefetch_pipeline
         self.lock_cache_line: bool = self.prefetch_pipeline
+        self.keep_lfu_history: bool = (
+            keep_lfu_history and cache_algorithm == CacheAlgorithm.LFU
+        )
 
         if record_cache_metrics is not None:
             self.record_cache_metrics = record_cache_metrics
@@ -350,15 +499,12 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         self.embedding_specs = embedding_specs
         (rows, dims, locations, compute_devices) = zip(*embedding_specs)
         T_ = len(self.embedding_specs)
-        self.dims: List[int] = dims
+        # NOTE: dims is immutable, so keep it as a tuple rather than a list
+        self.dims: Tuple[int, ...] = tuple(dims)
         assert T_ > 0
         # mixed D is not supported by no bag kernels
-        mixed_D = False
         D = self.dims[0]
-        for d in self.dims:
-            if d != D:
-                mixed_D = True
-                break
+        mixed_D = any(d != D for d in self.dims)
         if mixed_D:
             assert (
                 self.pooling_mode != PoolingMode.NONE
@@ -433,9 +579,16 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
             table_has_feature[t] = True
         assert all(table_has_feature), "Each table must have at least one feature!"
 
-        feature_dims = [dims[t] for t in self.feature_table_map]
-        D_offsets = [0] + list(accumulate(feature_dims))
-        self.total_D: int = D_offsets[-1]
+        # Build the per-feature metadata with vectorized CPU tensor ops rather
+        # than Python lists (NOTE: do not use numpy here to avoid pulling it in
+        # as a dependency)
+        feature_table_map_t = torch.tensor(self.feature_table_map, dtype=torch.int64)
+        feature_dims = torch.tensor(dims, dtype=torch.int64).index_select(
+            0, feature_table_map_t
+        )
+        D_offsets = torch.zeros(T + 1, dtype=torch.int64)
+        torch.cumsum(feature_dims, dim=0, out=D_offsets[1:])
+        self.total_D: int = int(D_offsets[-1])
         self.max_D: int = max(dims)
         cached_dims = [
             embedding_spec[1]
@@ -446,33 +599,28 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
 
         self.register_buffer(
             "D_offsets",
-            torch.tensor(D_offsets, device=self.current_device, dtype=torch.int32),
+            D_offsets.to(device=self.current_device, dtype=torch.int32),
         )
-        hash_size_cumsum = [0] + list(accumulate(rows))
-        self.total_hash_size: int = int(hash_size_cumsum[-1])
-        if self.total_hash_size == 0:
-            self.total_hash_size_bits: int = 0
-        else:
-            self.total_hash_size_bits: int = int(log2(float(self.total_hash_size)) + 1)
+        rows_t = torch.tensor(rows, dtype=torch.int64)
+        rows_cumsum = torch.zeros(T_ + 1, dtype=torch.int64)
+        torch.cumsum(rows_t, dim=0, out=rows_cumsum[1:])
+        self.total_hash_size: int = int(rows_cumsum[-1])
+        # Exact integer equivalent of int(log2(total_hash_size) + 1) (0 for an
+        # empty hash space) that does not lose precision for sizes >= 2^53
+        self.total_hash_size_bits: int = self.total_hash_size.bit_length()
         # The last element is to easily access # of rows of each table by
         # hash_size_cumsum[t + 1] - hash_size_cumsum[t]
-        hash_size_cumsum = [hash_size_cumsum[t] for t in self.feature_table_map] + [
-            self.total_hash_size
-        ]
+        hash_size_cumsum = torch.cat(
+            [rows_cumsum.index_select(0, feature_table_map_t), rows_cumsum[-1:]]
+        )
         self.register_buffer(
             "hash_size_cumsum",
-            torch.tensor(
-                hash_size_cumsum, device=self.current_device, dtype=torch.int64
-            ),
+            hash_size_cumsum.to(self.current_device),
         )
 
         self.register_buffer(
             "rows_per_table",
-            torch.tensor(
-                [rows[t] for t in self.feature_table_map],
-                device=self.current_device,
-                dtype=torch.int64,
-            ),
+            rows_t.index_select(0, feature_table_map_t).to(self.current_device),
         )
         self.register_buffer(
             "bounds_check_warning",
@@ -481,7 +629,7 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         # Required for VBE
         self.register_buffer(
             "feature_dims",
-            torch.tensor(feature_dims, device="cpu", dtype=torch.int64),
+            feature_dims,
         )
 
         weight_split = construct_split_state(
@@ -492,6 +640,13 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         )
         table_embedding_dtype = weights_precision.as_dtype()
 
+        self._applied_splits: List[Tuple[SplitState, str]] = []
+        # Per-table views built by split_embedding_weights() and
+        # split_optimizer_states(), keyed by the buffers they view
+        self._split_weights_cache: Optional[Tuple[List[int], List[Tensor]]] = None
+        self._split_optimizer_states_cache: Optional[
+            Tuple[List[int], List[List[Tensor]]]
+        ] = None
         self._apply_split(
             weight_split,
             prefix="weights",
@@ -592,30 +747,42 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
             total_hash_size=self.total_hash_size,
         )
 
+        # Optimizer states only differ by rowwise and placement, so construct
+        # each distinct split state once and share it across the prefixes
+        # (e.g., rowwise momentum1, prev_iter and row_counter)
+        optimizer_split_states: Dict[
+            Tuple[bool, Optional[EmbeddingLocation]], SplitState
+        ] = {}
+
+        def construct_optimizer_split_state(
+            rowwise: bool, placement: Optional[EmbeddingLocation] = None
+        ) -> SplitState:
+            # Key on the normalized arguments, so that the call form (e.g., an
+            # omitted vs. an explicit placement=None) does not matter
+            key = (rowwise, placement)
+            if key not in optimizer_split_states:
+                optimizer_split_states[key] = construct_split_state(
+                    embedding_specs,
+                    rowwise=rowwise,
+                    cacheable=False,
+                    placement=placement,
+                )
+            return optimizer_split_states[key]
+
         if optimizer != OptimType.NONE:
-            if optimizer in (OptimType.EXACT_SGD,):
-                # NOTE: make TorchScript work!
-                self._register_nonpersistent_buffers("momentum1")
-            else:
+            momentum1_split: Optional[SplitState] = None
+            if optimizer not in (OptimType.EXACT_SGD,):
                 rowwise = optimizer in [
                     OptimType.EXACT_ROWWISE_ADAGRAD,
                     OptimType.EXACT_ROWWISE_WEIGHTED_ADAGRAD,
                 ]
-                self._apply_split(
-                    construct_split_state(
-                        embedding_specs,
-                        rowwise=rowwise,
-                        cacheable=False,
-                        placement=EmbeddingLocation.MANAGED
-                        if ((not rowwise) and uvm_non_rowwise_momentum)
-                        else None,
-                    ),
-                    prefix="momentum1",
-                    # pyre-fixme[6]: Expected `Type[Type[torch._dtype]]` for 3rd param
-                    #  but got `Type[torch.float32]`.
-                    dtype=torch.float32,
-                    enforce_hbm=enforce_hbm,
+                momentum1_split = construct_optimizer_split_state(
+                    rowwise=rowwise,
+                    placement=EmbeddingLocation.MANAGED
+                    if ((not rowwise) and uvm_non_rowwise_momentum)
+                    else None,
                 )
+            momentum2_split: Optional[SplitState] = None
             if optimizer in (
                 OptimType.ADAM,
                 OptimType.PARTIAL_ROWWISE_ADAM,
@@ -626,15 +793,33 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                     OptimType.PARTIAL_ROWWISE_ADAM,
                     OptimType.PARTIAL_ROWWISE_LAMB,
                 )
+                momentum2_split = construct_optimizer_split_state(
+                    rowwise=rowwise,
+                    placement=EmbeddingLocation.MANAGED
+                    if ((not rowwise) and uvm_non_rowwise_momentum)
+                    else None,
+                )
+            counter_split: Optional[SplitState] = (
+                construct_optimizer_split_state(rowwise=True)
+                if self._used_rowwise_adagrad_with_counter
+                else None
+            )
+
+            if momentum1_split is None:
+                # NOTE: make TorchScript work!
+                self._register_nonpersistent_buffers("momentum1")
+            else:
                 self._apply_split(
-                    construct_split_state(
-                        embedding_specs,
-                        rowwise=rowwise,
-                        cacheable=False,
-                        placement=EmbeddingLocation.MANAGED
-                        if ((not rowwise) and uvm_non_rowwise_momentum)
-                        else None,
-                    ),
+                    momentum1_split,
+                    prefix="momentum1",
+                    # pyre-fixme[6]: Expected `Type[Type[torch._dtype]]` for 3rd param
+                    #  but got `Type[torch.float32]`.
+                    dtype=torch.float32,
+                    enforce_hbm=enforce_hbm,
+                )
+            if momentum2_split is not None:
+                self._apply_split(
+                    momentum2_split,
                     prefix="momentum2",
                     # pyre-fixme[6]: Expected `Type[Type[torch._dtype]]` for 3rd param
                     #  but got `Type[torch.float32]`.
@@ -643,13 +828,9 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
             else:
                 # NOTE: make TorchScript work!
                 self._register_nonpersistent_buffers("momentum2")
-            if self._used_rowwise_adagrad_with_counter:
+            if counter_split is not None:
                 self._apply_split(
-                    construct_split_state(
-                        embedding_specs,
-                        rowwise=True,
-                        cacheable=False,
-                    ),
+                    counter_split,
                     prefix="prev_iter",
                     # TODO: ideally we should use int64 to track iter but it failed to compile.
                     # It may be related to low precision training code. Currently using float32
@@ -659,11 +840,7 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                     dtype=torch.float32,
                 )
                 self._apply_split(
-                    construct_split_state(
-                        embedding_specs,
-                        rowwise=True,
-                        cacheable=False,
-                    ),
+                    counter_split,
                     prefix="row_counter",
                     # pyre-fixme[6]: Expected `Type[Type[torch._dtype]]` for 3rd param
                     #  but got `Type[torch.float32]`.
@@ -672,6 +849,11 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                 self.register_buffer(
                     "max_counter", torch.tensor([1], dtype=torch.float32)
                 )
+                # Pinned buffer and event used to refresh max_counter without
+                # blocking; created on the first refresh. No event means no
+                # refresh is in flight
+                self._max_counter_event: Optional[torch.cuda.Event] = None
+                self._max_counter_pinned: Optional[Tensor] = None
             else:
                 self._register_nonpersistent_buffers("prev_iter")
                 self._register_nonpersistent_buffers("row_counter")
@@ -687,23 +869,29 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                 OptimType.PARTIAL_ROWWISE_ADAM,
                 OptimType.PARTIAL_ROWWISE_LAMB,
             ):
+                # iter always lives on CPU (see _apply) so that updating it
+                # in forward does not synchronize
                 self.register_buffer(
-                    "iter",
-                    torch.zeros(1, dtype=torch.int64, device=self.current_device),
+                    "iter", torch.zeros(1, dtype=torch.int64, device="cpu")
                 )
 
             else:
                 self.register_buffer(
                     "iter",
-                    torch.zeros(1, dtype=torch.int64, device=self.current_device),
+                    torch.zeros(1, dtype=torch.int64, device="cpu"),
                     persistent=False,
                 )
+            # Python mirror of max_counter, so forward can pass it to the
+            # lookup invokers without reading the device tensor every step
+            self._max_counter_py: float = 1.0
 
-        cache_state = construct_cache_state(rows, locations, self.feature_table_map)
+        cache_hash_size_cumsum, cache_index_table_map = construct_cache_state_tensors(
+            rows, locations, self.feature_table_map, self.current_device
+        )
 
         # Add table-wise cache miss counter
         if self.record_cache_metrics.record_tablewise_cache_miss:
-            num_tables = len(cache_state.cache_hash_size_cumsum) - 1
+            num_tables = len(self.feature_table_map)
             self.register_buffer(
                 "table_wise_cache_miss",
                 torch.zeros(
@@ -731,12 +919,15 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
             raise AssertionError(f"cache_precision {cache_precision} not supported!")
 
         self._apply_cache_state(
-            cache_state,
+            cache_hash_size_cumsum,
+            cache_index_table_map,
             cache_algorithm,
             cache_load_factor,
             cache_sets,
             cache_reserved_memory,
             dtype=cache_embedding_dtype,
+            managed_lxu_state=managed_lxu_state,
+            cache_mem_pool=cache_mem_pool,
         )
 
         logging.info(
@@ -746,6 +937,17 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
 
         self.step = 0
 
+        # VBE metadata is immutable and identical for every non-VBE forward, so
+        # build it once instead of on every step
+        self.default_vbe_metadata = invokers.lookup_args.VBEMetadata(
+            B_offsets=None,
+            output_offsets_feature_rank=None,
+            B_offsets_rank_per_feature=None,
+            max_B=-1,
+            max_B_feature_rank=-1,
+            output_size=-1,
+        )
+
         # Check whether to use TBE v2
         is_experimental = False
         fbgemm_exp_tbe = os.environ.get("FBGEMM_EXPERIMENTAL_TBE")
@@ -764,46 +966,108 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
 
     def _register_nonpersistent_buffers(self, prefix: str) -> None:
         # NOTE: make TorchScript work!
-        self.register_buffer(
-            f"{prefix}_dev",
-            torch.zeros(1, dtype=torch.int64, device=self.current_device),
-            persistent=False,
-        )
-        self.register_buffer(
-            f"{prefix}_host",
-            torch.zeros(1, dtype=torch.int64, device=self.current_device),
-            persistent=False,
+        # The placeholders are never read nor written, so all of them share a
+        # single tensor instead of allocating one tensor per buffer
+        placeholder = torch.zeros(1, dtype=torch.int64, device=self.current_device)
+        for suffix in ("dev", "host", "uvm", "placements", "offsets"):
+            self.register_buffer(f"{prefix}_{suffix}", placeholder, persistent=False)
+
+    # NOTE: the Momentum args are built from the live buffers on every call
+    # rather than cached, since the buffers can be replaced (e.g., by
+    # module.to() or load_state_dict(assign=True)), including on a scripted
+    # module that does not run the Python overrides of this class
+    def _momentum1_args(self) -> invokers.lookup_args.Momentum:
+        return invokers.lookup_args.Momentum(
+            dev=self.momentum1_dev,
+            host=self.momentum1_host,
+            uvm=self.momentum1_uvm,
+            offsets=self.momentum1_offsets,
+            placements=self.momentum1_placements,
         )
-        self.register_buffer(
-            f"{prefix}_uvm",
-            torch.zeros(1, dtype=torch.int64, device=self.current_device),
-            persistent=False,
+
+    def _momentum2_args(self) -> invokers.lookup_args.Momentum:
+        return invokers.lookup_args.Momentum(
+            dev=self.momentum2_dev,
+            host=self.momentum2_host,
+            uvm=self.momentum2_uvm,
+            offsets=self.momentum2_offsets,
+            placements=self.momentum2_placements,
         )
-        self.register_buffer(
-            f"{prefix}_placements",
-            torch.zeros(1, dtype=torch.int64, device=self.current_device),
-            persistent=False,
+
+    def _prev_iter_args(self) -> invokers.lookup_args.Momentum:
+        return invokers.lookup_args.Momentum(
+            dev=self.prev_iter_dev,
+            host=self.prev_iter_host,
+            uvm=self.prev_iter_uvm,
+            offsets=self.prev_iter_offsets,
+            placements=self.prev_iter_placements,
         )
-        self.register_buffer(
-            f"{prefix}_offsets",
-            torch.zeros(1, dtype=torch.int64, device=self.current_device),
-            persistent=False,
+
+    def _row_counter_args(self) -> invokers.lookup_args.Momentum:
+        return invokers.lookup_args.Momentum(
+            dev=self.row_counter_dev,
+            host=self.row_counter_host,
+            uvm=self.row_counter_uvm,
+            offsets=self.row_counter_offsets,
+            placements=self.row_counter_placements,
         )
 
+    def _apply(
+        self, *args: Any, **kwargs: Any
+    ) -> "SplitTableBatchedEmbeddingBagsCodegen":
+        # nn.Module._apply (e.g., module.to(), module.cuda()) replaces the
+        # buffer tensors, so drop the cached per-table views so they don't
+        # keep the replaced storages alive
+        module = super()._apply(*args, **kwargs)
+        self._split_weights_cache = None
+        self._split_optimizer_states_cache = None
+        if self.optimizer != OptimType.NONE:
+            # Keep iter on CPU, which forward relies on
+            if self.iter.device.type not in ("cpu", "meta"):
+                self.iter = self.iter.cpu()
+        return module
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The CUDA event (and its pinned buffer) of an in-flight max_counter
+        # refresh can't be copied or pickled, so copies start without one and
+        # do their first refresh synchronously
+        state = self.__dict__.copy()
+        if state.get("_max_counter_event") is not None:
+            state["_max_counter_event"] = None
+            state["_max_counter_pinned"] = None
+        return state
+
+    def _load_from_state_dict(self, *args: Any, **kwargs: Any) -> None:
+        # max_counter can be persistent, so resync its Python mirror after
+        # loading a checkpoint
+        super()._load_from_state_dict(*args, **kwargs)
+        # Loading with assign=True replaces the buffers, so drop the cached
+        # per-table views as _apply does
+        self._split_weights_cache = None
+        self._split_optimizer_states_cache = None
+        if self.optimizer != OptimType.NONE:
+            self._max_counter_py = float(self.max_counter.item())
+            if self._used_rowwise_adagrad_with_counter:
+                # Drop any in-flight max_counter refresh, which was computed
+                # from the old row_counter; the next refresh is synchronous
+                self._max_counter_event = None
+
     def get_states(self, prefix: str) -> Tuple[Tensor, Tensor, Tensor, Tensor, Tensor]:
         if not hasattr(self, f"{prefix}_physical_placements"):
             raise DoesNotHavePrefix()
         dev_param = getattr(self, f"{prefix}_dev")
         host_param = getattr(self, f"{prefix}_host")
         uvm_param = getattr(self, f"{prefix}_uvm")
-        placements = getattr(self, f"{prefix}_physical_placements")
-        offsets = getattr(self, f"{prefix}_physical_offsets")
+        # Hand out copies of the cached tensors, so that a caller mutating them
+        # does not corrupt later calls
+        placements = getattr(self, f"{prefix}_physical_placements_tensor").clone()
+        offsets = getattr(self, f"{prefix}_physical_offsets_tensor").clone()
         return (
             dev_param,
             host_param,
             uvm_param,
-            torch.tensor(placements, dtype=torch.int32),
-            torch.tensor(offsets, dtype=torch.int64),
+            placements,
+            offsets,
         )
 
     def get_all_states(self) -> List[Tuple[Tensor, Tensor, Tensor, Tensor, Tensor]]:
@@ -914,16 +1178,20 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                 output_size=output_size,
             )
         else:
-            vbe_metadata = invokers.lookup_args.VBEMetadata(
-                B_offsets=None,
-                output_offsets_feature_rank=None,
-                B_offsets_rank_per_feature=None,
-                max_B=-1,
-                max_B_feature_rank=-1,
-                output_size=-1,
-            )
-
-        (indices, offsets) = indices.long(), offsets.long()
+            vbe_metadata = self.default_vbe_metadata
+
+        # bounds_check_indices supports both int32 and int64, so in FATAL mode
+        # it runs on the incoming indices/offsets before widening them. This
+        # way int32 inputs are scanned at half the width. The WARNING and
+        # IGNORE modes fix up out-of-bounds entries in place, so the tensors
+        # are widened first to leave the caller's int32 tensors untouched.
+        # Both tensors must share the same dtype.
+        if (
+            indices.dtype != offsets.dtype
+            or self.bounds_check_mode_int == BoundsCheckMode.WARNING.value
+            or self.bounds_check_mode_int == BoundsCheckMode.IGNORE.value
+        ):
+            (indices, offsets) = indices.long(), offsets.long()
         if self.bounds_check_mode_int != BoundsCheckMode.NONE.value:
             torch.ops.fbgemm.bounds_check_indices(
                 self.rows_per_table,
@@ -935,6 +1203,11 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                 B_offsets=vbe_metadata.B_offsets,
                 max_B=vbe_metadata.max_B,
             )
+        # Only cast when needed; int64 inputs are passed through untouched
+        if indices.dtype != torch.int64:
+            indices = indices.long()
+        if offsets.dtype != torch.int64:
+            offsets = offsets.long()
         self.step += 1
         if len(self.timesteps_prefetched) == 0:
             self._prefetch(indices, offsets)
@@ -969,137 +1242,232 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
             is_experimental=self.is_experimental,
         )
 
-        if self.optimizer == OptimType.NONE:
-            assert (
-                total_unique_indices is not None
-                and total_unique_indices <= indices.numel()
-            ), f"OptimType.NONE requires total_unique_indices. Please pass it or check the value (total_unique_indices = {total_unique_indices})"
-            return invokers.lookup_none.invoke(
-                common_args, self.optimizer_args, total_unique_indices
-            )
-        elif self.optimizer == OptimType.EXACT_SGD:
-            return invokers.lookup_sgd.invoke(common_args, self.optimizer_args)
+        # NOTE: this single dispatch serves both eager and scripted modules;
+        # TorchScript cannot call through a table of bound methods
+        optimizer = self.optimizer
+        if optimizer == OptimType.NONE:
+            return self._forward_none(common_args, total_unique_indices)
+        if optimizer == OptimType.EXACT_SGD:
+            return self._forward_sgd(common_args, total_unique_indices)
+        if optimizer == OptimType.LARS_SGD:
+            return self._forward_lars_sgd(common_args, total_unique_indices)
+        if optimizer == OptimType.EXACT_ADAGRAD:
+            return self._forward_adagrad(common_args, total_unique_indices)
+        if optimizer == OptimType.EXACT_ROWWISE_ADAGRAD:
+            if self._used_rowwise_adagrad_with_counter:
+                return self._forward_rowwise_adagrad_with_counter(
+                    common_args, total_unique_indices
+                )
+            return self._forward_rowwise_adagrad(common_args, total_unique_indices)
+        if optimizer == OptimType.EXACT_ROWWISE_WEIGHTED_ADAGRAD:
+            return self._forward_rowwise_weighted_adagrad(
+                common_args, total_unique_indices
+            )
+        if optimizer == OptimType.ADAM:
+            return self._forward_adam(common_args, total_unique_indices)
+        if optimizer == OptimType.PARTIAL_ROWWISE_ADAM:
+            return self._forward_partial_rowwise_adam(
+                common_args, total_unique_indices
+            )
+        if optimizer == OptimType.LAMB:
+            return self._forward_lamb(common_args, total_unique_indices)
+        if optimizer == OptimType.PARTIAL_ROWWISE_LAMB:
+            return self._forward_partial_rowwise_lamb(
+                common_args, total_unique_indices
+            )
+        return self._forward_invalid(common_args, total_unique_indices)
+
+    def _increment_iter(self) -> int:
+        # iter lives on CPU, so reading it back does not sync with the device
+        self.iter[0] += 1
+        return int(self.iter.item())
 
-        momentum1 = invokers.lookup_args.Momentum(
-            dev=self.momentum1_dev,
-            host=self.momentum1_host,
-            uvm=self.momentum1_uvm,
-            offsets=self.momentum1_offsets,
-            placements=self.momentum1_placements,
+    def _forward_none(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
+        assert (
+            total_unique_indices is not None
+            and total_unique_indices <= common_args.indices.numel()
+        ), f"OptimType.NONE requires total_unique_indices. Please pass it or check the value (total_unique_indices = {total_unique_indices})"
+        return invokers.lookup_none.invoke(
+            common_args, self.optimizer_args, total_unique_indices
         )
 
-        if self.optimizer == OptimType.LARS_SGD:
-            return invokers.lookup_lars_sgd.invoke(
-                common_args, self.optimizer_args, momentum1
-            )
-        if self.optimizer == OptimType.EXACT_ADAGRAD:
-            return invokers.lookup_adagrad.invoke(
-                common_args, self.optimizer_args, momentum1
-            )
+    def _forward_sgd(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
+        return invokers.lookup_sgd.invoke(common_args, self.optimizer_args)
 
-        momentum2 = invokers.lookup_args.Momentum(
-            dev=self.momentum2_dev,
-            host=self.momentum2_host,
-            uvm=self.momentum2_uvm,
-            offsets=self.momentum2_offsets,
-            placements=self.momentum2_placements,
+    def _forward_lars_sgd(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
+        return invokers.lookup_lars_sgd.invoke(
+            common_args, self.optimizer_args, self._momentum1_args()
         )
-        # Ensure iter is always on CPU so the increment doesn't synchronize.
-        if not self.iter.is_cpu:
-            self.iter = self.iter.cpu()
-        self.iter[0] += 1
 
-        if self.optimizer == OptimType.EXACT_ROWWISE_WEIGHTED_ADAGRAD:
-            return invokers.lookup_rowwise_weighted_adagrad.invoke(
-                common_args,
-                self.optimizer_args,
-                momentum1,
-                # pyre-fixme[6]: Expected `int` for 4th param but got `Union[float,
-                #  int]`.
-                self.iter.item(),
-            )
-        if self.optimizer == OptimType.ADAM:
-            return invokers.lookup_adam.invoke(
-                common_args,
-                self.optimizer_args,
-                momentum1,
-                momentum2,
-                # pyre-fixme[6]: Expected `int` for 5th param but got `Union[float,
-                #  int]`.
-                self.iter.item(),
-            )
-        if self.optimizer == OptimType.PARTIAL_ROWWISE_ADAM:
-            return invokers.lookup_partial_rowwise_adam.invoke(
-                common_args,
-                self.optimizer_args,
-                momentum1,
-                momentum2,
-                # pyre-fixme[6]: Expected `int` for 5th param but got `Union[float,
-                #  int]`.
-                self.iter.item(),
-            )
-        if self.optimizer == OptimType.LAMB:
-            return invokers.lookup_lamb.invoke(
-                common_args,
-                self.optimizer_args,
-                momentum1,
-                momentum2,
-                # pyre-fixme[6]: Expected `int` for 5th param but got `Union[float,
-                #  int]`.
-                self.iter.item(),
-            )
-        if self.optimizer == OptimType.PARTIAL_ROWWISE_LAMB:
-            return invokers.lookup_partial_rowwise_lamb.invoke(
-                common_args,
-                self.optimizer_args,
-                momentum1,
-                momentum2,
-                # pyre-fixme[6]: Expected `int` for 5th param but got `Union[float,
-                #  int]`.
-                self.iter.item(),
-            )
-
-        prev_iter = invokers.lookup_args.Momentum(
-            dev=self.prev_iter_dev,
-            host=self.prev_iter_host,
-            uvm=self.prev_iter_uvm,
-            offsets=self.prev_iter_offsets,
-            placements=self.prev_iter_placements,
+    def _forward_adagrad(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
+        return invokers.lookup_adagrad.invoke(
+            common_args, self.optimizer_args, self._momentum1_args()
         )
-        row_counter = invokers.lookup_args.Momentum(
-            dev=self.row_counter_dev,
-            host=self.row_counter_host,
-            uvm=self.row_counter_uvm,
-            offsets=self.row_counter_offsets,
-            placements=self.row_counter_placements,
+
+    def _forward_rowwise_adagrad(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
+        self._increment_iter()
+        return invokers.lookup_rowwise_adagrad.invoke(
+            common_args, self.optimizer_args, self._momentum1_args()
         )
-        if self._used_rowwise_adagrad_with_counter:
-            if self.iter.item() % self._max_counter_update_freq == 0:
-                row_counter_dev = self.row_counter_dev.detach()
-                if row_counter_dev.numel() > 0:
-                    self.max_counter[0] = torch.max(row_counter_dev).cpu().item() + 1
-                else:
-                    self.max_counter[0] = 1
 
-        if self.optimizer == OptimType.EXACT_ROWWISE_ADAGRAD:
-            if self._used_rowwise_adagrad_with_counter:
-                return invokers.lookup_rowwise_adagrad_with_counter.invoke(
-                    common_args,
-                    self.optimizer_args,
-                    momentum1,
-                    prev_iter,
-                    row_counter,
-                    # pyre-fixme[6]: Expected `int` for 6th param but got `Union[float, int]`.
-                    self.iter.item(),
-                    self.max_counter.item(),
-                )
+    def _forward_rowwise_adagrad_with_counter(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
+        iter_ = self._increment_iter()
+        if iter_ % self._max_counter_update_freq == 0:
+            if torch.jit.is_scripting():
+                self._refresh_max_counter()
             else:
-                return invokers.lookup_rowwise_adagrad.invoke(
-                    common_args, self.optimizer_args, momentum1
-                )
+                self._refresh_max_counter_async()
+        return invokers.lookup_rowwise_adagrad_with_counter.invoke(
+            common_args,
+            self.optimizer_args,
+            self._momentum1_args(),
+            self._prev_iter_args(),
+            self._row_counter_args(),
+            iter_,
+            self._max_counter_py,
+        )
 
+    def _forward_rowwise_weighted_adagrad(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
+        return invokers.lookup_rowwise_weighted_adagrad.invoke(
+            common_args,
+            self.optimizer_args,
+            self._momentum1_args(),
+            self._increment_iter(),
+        )
+
+    def _forward_adam(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
+        return invokers.lookup_adam.invoke(
+            common_args,
+            self.optimizer_args,
+            self._momentum1_args(),
+            self._momentum2_args(),
+            self._increment_iter(),
+        )
+
+    def _forward_partial_rowwise_adam(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
+        return invokers.lookup_partial_rowwise_adam.invoke(
+            common_args,
+            self.optimizer_args,
+            self._momentum1_args(),
+            self._momentum2_args(),
+            self._increment_iter(),
+        )
+
+    def _forward_lamb(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
+        return invokers.lookup_lamb.invoke(
+            common_args,
+            self.optimizer_args,
+            self._momentum1_args(),
+            self._momentum2_args(),
+            self._increment_iter(),
+        )
+
+    def _forward_partial_rowwise_lamb(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
+        return invokers.lookup_partial_rowwise_lamb.invoke(
+            common_args,
+            self.optimizer_args,
+            self._momentum1_args(),
+            self._momentum2_args(),
+            self._increment_iter(),
+        )
+
+    def _forward_invalid(
+        self,
+        common_args: invokers.lookup_args.CommonArgs,
+        total_unique_indices: Optional[int],
+    ) -> Tensor:
         raise ValueError(f"Invalid OptimType: {self.optimizer}")
 
+    def _refresh_max_counter(self) -> None:
+        row_counter_dev = self.row_counter_dev.detach()
+        if row_counter_dev.numel() > 0:
+            self._max_counter_py = float(torch.max(row_counter_dev).cpu().item()) + 1.0
+        else:
+            self._max_counter_py = 1.0
+        self.max_counter[0] = self._max_counter_py
+
+    @torch.jit.unused
+    def _refresh_max_counter_async(self) -> None:
+        """
+        Refreshes max_counter without a device-to-host sync. The max of
+        row_counter_dev is copied to pinned memory asynchronously, and the
+        result is only read on the next refresh once its event has completed.
+        The first refresh (and the first one after loading a checkpoint) is
+        synchronous, after which max_counter lags by one refresh period.
+        """
+        row_counter_dev = self.row_counter_dev.detach()
+        if not row_counter_dev.is_cuda or row_counter_dev.numel() == 0:
+            self._refresh_max_counter()
+            return
+
+        if self._max_counter_event is None:
+            self._refresh_max_counter()
+            self._max_counter_event = torch.cuda.Event()
+            if self._max_counter_pinned is None:
+                self._max_counter_pinned = torch.empty(
+                    1, dtype=row_counter_dev.dtype, pin_memory=True
+                )
+        else:
+            if not self._max_counter_event.query():
+                # The previous refresh is still in flight
+                return
+            assert self._max_counter_pinned is not None
+            self._max_counter_py = float(self._max_counter_pinned.item()) + 1.0
+            self.max_counter[0] = self._max_counter_py
+
+        # Reduce on the current stream, so that the reduction is ordered with
+        # the backward kernels updating row_counter_dev; only the copy of the
+        # result to the host is asynchronous
+        # pyre-fixme[16]: `Optional` has no attribute `copy_`.
+        self._max_counter_pinned.copy_(
+            torch.max(row_counter_dev).view(1), non_blocking=True
+        )
+        self._max_counter_event.record()
+
     def reset_uvm_cache_stats(self) -> None:
         assert (
             self.gather_uvm_cache_stats
@@ -1138,6 +1506,18 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         offsets: Tensor,
         forward_stream: Optional[torch.cuda.Stream] = None,
     ) -> None:
+        """
+        Prefetches the rows of the next batch into the UVM cache ahead of forward.
+
+        If forward() is called without a prior prefetch(), the cache lookup and
+        refill run synchronously inside forward(). To hide the cache refill
+        latency, call prefetch(batch_{i+1}) one step ahead under a side stream
+        (e.g., `with torch.cuda.stream(prefetch_stream):`) and pass the stream
+        that runs forward/backward as `forward_stream`, so that the tensors
+        produced here are recorded on it. With `prefetch_pipeline=True`,
+        forward/backward and prefetch are synchronized through the hooks
+        registered in _apply_cache_state.
+        """
         if self.prefetch_stream is None and forward_stream is not None:
             self.prefetch_stream = torch.cuda.current_stream()
             assert (
@@ -1154,7 +1534,10 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         if not self.lxu_cache_weights.numel():
             return
 
-        (indices, offsets) = indices.long(), offsets.long()
+        if indices.dtype != torch.int64:
+            indices = indices.long()
+        if offsets.dtype != torch.int64:
+            offsets = offsets.long()
         linear_cache_indices = torch.ops.fbgemm.linearize_cache_indices(
             self.cache_hash_size_cumsum,
             indices,
@@ -1165,12 +1548,14 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
             self.record_cache_metrics.record_cache_miss_counter
             or self.record_cache_metrics.record_tablewise_cache_miss
         ):
+            # NOTE: This lookup runs before the populate below and sees the
+            # misses the populate will fill, so it cannot be shared with the
+            # post-populate lookup. It also must not gather UVM cache stats,
+            # or every compulsory miss gets counted as a conflict miss
             lxu_cache_locations = torch.ops.fbgemm.lxu_cache_lookup(
                 linear_cache_indices,
                 self.lxu_cache_state,
                 self.total_cache_hash_size,
-                self.gather_uvm_cache_stats,
-                self.local_uvm_cache_stats,
             )
             if self.record_cache_metrics.record_cache_miss_counter:
                 self._update_cache_miss_counter(
@@ -1235,9 +1620,7 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
             # Accumulate local_uvm_cache_stats (int32) into uvm_cache_stats (int64).
             # We may wanna do this accumulation atomically, but as it's only for monitoring,
             # slightly inaccurate result may be acceptable.
-            self.uvm_cache_stats = torch.add(
-                self.uvm_cache_stats, self.local_uvm_cache_stats
-            )
+            self.uvm_cache_stats.add_(self.local_uvm_cache_stats)
             self.local_uvm_cache_stats.zero_()
 
     def _prefetch_tensors_record_stream(
@@ -1260,19 +1643,19 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         linear_cache_indices: Tensor,
     ) -> None:
         CACHE_MISS = -1
-        CACHE_HIT = -2
 
-        cache_missed_locations = torch.where(
-            lxu_cache_locations == CACHE_MISS, linear_cache_indices, CACHE_HIT
-        )
-        unique_ids_list = torch.unique(cache_missed_locations)
-        unique_ids_count_list = torch.where(unique_ids_list == CACHE_HIT, 0, 1)
-
-        miss_count = torch.sum(unique_ids_count_list)
-
-        self.cache_miss_counter[0] += (miss_count > 0).to(torch.int64)
-
-        self.cache_miss_counter[1] += miss_count
+        # Only count the distinct missed indices rather than dedup the whole
+        # batch with the hits replaced by a sentinel. Only the count is
+        # needed, so sort and count the boundaries on device instead of
+        # materializing torch.unique (which also syncs to size its output)
+        cache_missed_indices = linear_cache_indices[lxu_cache_locations == CACHE_MISS]
+        if cache_missed_indices.numel() == 0:
+            return
+        sorted_missed_indices, _ = torch.sort(cache_missed_indices)
+        self.cache_miss_counter[0] += 1
+        self.cache_miss_counter[1] += (
+            sorted_missed_indices[1:] != sorted_missed_indices[:-1]
+        ).sum() + 1
 
     def _update_tablewise_cache_miss(
         self,
@@ -1281,29 +1664,48 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         offsets: Tensor,
     ) -> None:
         CACHE_MISS = -1
-        CACHE_HIT = -2
 
-        num_tables = len(self.cache_hash_size_cumsum) - 1
-        num_offsets_per_table = (len(offsets) - 1) // num_tables
-        cache_missed_locations = torch.where(
-            lxu_cache_locations == CACHE_MISS, linear_cache_indices, CACHE_HIT
+        num_tables = self._num_tables
+        num_offsets_per_table = (offsets.size(0) - 1) // num_tables
+
+        # Tag each index with its table and dedup the (table, linear index)
+        # pairs of all the misses at once instead of running unique per table.
+        # The table boundaries are looked up rather than assumed to start at
+        # index 0, since offsets[0] need not be 0
+        table_offsets = offsets[
+            : num_tables * num_offsets_per_table + 1 : num_offsets_per_table
+        ].contiguous()
+        positions = torch.arange(
+            linear_cache_indices.numel(), device=offsets.device, dtype=offsets.dtype
         )
+        table_ids = torch.searchsorted(table_offsets, positions, right=True) - 1
+        is_miss = (
+            (lxu_cache_locations == CACHE_MISS)
+            & (table_ids >= 0)
+            & (table_ids < num_tables)
+        )
+        # Linear cache indices are in [0, total_cache_hash_size]. Build the
+        # keys of all the indices and mask them once, which is the one
+        # device-to-host sync left here (to size the missed keys)
+        key_stride = self.total_cache_hash_size + 1
+        missed_keys = (table_ids * key_stride + linear_cache_indices)[is_miss]
+        if missed_keys.numel() == 0:
+            return
 
-        for i in range(num_tables):
-            start = offsets[i * num_offsets_per_table]
-            end = offsets[(i + 1) * num_offsets_per_table]
-
-            current_cache_missed_locations = cache_missed_locations[start:end]
-            unique_ids_list = torch.unique(current_cache_missed_locations)
-            unique_ids_count_list = torch.where(unique_ids_list == CACHE_HIT, 0, 1)
-
-            miss_count = torch.sum(unique_ids_count_list)
-
-            self.table_wise_cache_miss[i] += miss_count
+        # Sort the keys and count the first occurrence of each one towards its
+        # table, without materializing torch.unique
+        sorted_missed_keys, _ = torch.sort(missed_keys)
+        is_first = torch.ones_like(sorted_missed_keys)
+        is_first[1:] = sorted_missed_keys[1:] != sorted_missed_keys[:-1]
+        self.table_wise_cache_miss.scatter_add_(
+            0,
+            torch.div(sorted_missed_keys, key_stride, rounding_mode="floor"),
+            is_first,
+        )
 
     def init_embedding_weights_uniform(self, min_val: float, max_val: float) -> None:
-        splits = self.split_embedding_weights()
         if self.weights_precision == SparseType.INT8:
+            splits = self.split_embedding_weights()
             # TODO: add in-place FloatToFused8BitRowwiseQuantized conversion
             for emb in splits:
                 assert (
@@ -1315,14 +1717,23 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                 tmp_emb_i8 = torch.ops.fbgemm.FloatToFused8BitRowwiseQuantized(tmp_emb)
                 emb.data.copy_(tmp_emb_i8)
         else:
-            for param in splits:
-                param.uniform_(min_val, max_val)
+            # The tables are packed back to back in the dev/host/uvm buffers, so
+            # fill each buffer with one kernel instead of one per table
+            for weights in (self.weights_dev, self.weights_host, self.weights_uvm):
+                if weights.numel() > 0:
+                    weights.detach().uniform_(min_val, max_val)
 
     @torch.jit.ignore
     def split_embedding_weights(self) -> List[Tensor]:
         """
         Returns a list of weights, split by table
         """
+        key = self._split_views_key(["weights"])
+        if self._split_weights_cache is not None:
+            cached_key, cached_splits = self._split_weights_cache
+            if cached_key == key:
+                return list(cached_splits)
+
         splits = []
         for t, (rows, dim, _, _) in enumerate(self.embedding_specs):
             if self.weights_precision == SparseType.INT8:
@@ -1337,10 +1748,26 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                 weights = self.weights_uvm
             if weights.dim() == 2:
                 weights = weights.flatten()
+            # A single as_strided view instead of slice + view
             splits.append(
-                weights.detach()[offset : offset + rows * dim].view(rows, dim)
+                weights.detach().as_strided(
+                    (rows, dim), (dim, 1), weights.storage_offset() + offset
+                )
             )
-        return splits
+        self._split_weights_cache = (key, splits)
+        return list(splits)
+
+    @torch.jit.ignore
+    def _split_views_key(self, prefixes: List[str]) -> List[int]:
+        # The per-table views returned by split_embedding_weights() and
+        # split_optimizer_states() stay valid for as long as the underlying
+        # buffers do. Since the cached views keep the old storages alive, a
+        # replaced buffer (e.g., by module.to()) always changes the key
+        return [
+            getattr(self, f"{prefix}_{suffix}").data_ptr()
+            for prefix in prefixes
+            for suffix in ("dev", "host", "uvm")
+        ]
 
     @torch.jit.ignore
     def get_optimizer_buffer(self, state: str) -> torch.Tensor:
@@ -1404,6 +1831,14 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                 f"Getting optimizer states is not supported for {self.optimizer}"
             )
 
+        key = self._split_views_key(
+            ["momentum1", "momentum2", "prev_iter", "row_counter"]
+        )
+        if self._split_optimizer_states_cache is not None:
+            cached_key, cached_states = self._split_optimizer_states_cache
+            if cached_key == key:
+                return [list(s) for s in cached_states]
+
         def get_optimizer_states(
             state_dev: Tensor,
             state_host: Tensor,
@@ -1422,12 +1857,13 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                     state = state_host
                 else:
                     state = state_uvm
+                base = state.storage_offset() + offset
                 if not rowwise:
                     splits.append(
-                        state.detach()[offset : offset + rows * dim].view(rows, dim)
+                        state.detach().as_strided((rows, dim), (dim, 1), base)
                     )
                 else:
-                    splits.append(state.detach()[offset : offset + rows].view(rows))
+                    splits.append(state.detach().as_strided((rows,), (1,), base))
             return splits
 
         states: List[List[torch.Tensor]] = []
@@ -1485,7 +1921,8 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                 )
             )
         return_states = [list(s) for s in zip(*states)]
-        return return_states
+        self._split_optimizer_states_cache = (key, return_states)
+        return [list(s) for s in return_states]
 
     @torch.jit.export
     def set_learning_rate(self, lr: float) -> None:
@@ -1543,6 +1980,23 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         make_dev_param: bool = False,
         dev_reshape: Optional[Tuple[int, ...]] = None,
     ) -> None:
+        # Prefixes whose splits lay out every table the same way (e.g., the
+        # rowwise momentum1, prev_iter and row_counter) copy the
+        # {prefix}_offsets/{prefix}_placements of the first such prefix on the
+        # device instead of building and uploading them again. They are
+        # persistent, so each prefix gets its own tensors rather than aliases
+        # (which state_dict consumers such as safetensors reject)
+        index_tensors = None
+        for applied_split, applied_prefix in self._applied_splits:
+            if (
+                applied_split.placements == split.placements
+                and applied_split.offsets == split.offsets
+            ):
+                index_tensors = (
+                    getattr(self, f"{applied_prefix}_offsets").clone(),
+                    getattr(self, f"{applied_prefix}_placements").clone(),
+                )
+                break
         apply_split_helper(
             self.register_buffer,
             functools.partial(setattr, self),
@@ -1555,18 +2009,51 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
             enforce_hbm,
             make_dev_param,
             dev_reshape,
+            index_tensors,
+        )
+        self._applied_splits.append((split, prefix))
+        # The physical placements/offsets never change after the split is
+        # applied, so build their (CPU) tensors once for get_states()
+        setattr(
+            self,
+            f"{prefix}_physical_placements_tensor",
+            torch.tensor(split.placements, dtype=torch.int32),
         )
+        setattr(
+            self,
+            f"{prefix}_physical_offsets_tensor",
+            torch.tensor(split.offsets, dtype=torch.int64),
+        )
+
+    @contextlib.contextmanager
+    def _cache_buffers_allocation(
+        self, cache_mem_pool: Optional[Any]
+    ) -> Iterator[None]:
+        """
+        Context for allocating the long-lived cache buffers, from
+        `cache_mem_pool` (a torch.cuda.MemPool owned by the caller) if given.
+        """
+        if cache_mem_pool is None or self.current_device.type != "cuda":
+            yield
+            return
+        with torch.cuda.use_mem_pool(cache_mem_pool, device=self.current_device):
+            yield
 
     def _apply_cache_state(
         self,
-        cache_state: CacheState,
+        cache_hash_size_cumsum: Tensor,
+        cache_index_table_map: Tensor,
         cache_algorithm: CacheAlgorithm,
         cache_load_factor: float,
         cache_sets: int,
         cache_reserved_memory: float,
         dtype: torch.dtype,
+        managed_lxu_state: bool = False,
+        cache_mem_pool: Optional[Any] = None,
     ) -> None:
         self.cache_algorithm = cache_algorithm
+        self._num_tables: int = cache_hash_size_cumsum.numel() - 1
+        total_cache_hash_size = cache_index_table_map.numel()
         self.timestep = 1
         self.timesteps_prefetched = []
 
@@ -1574,7 +2061,7 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         self.lxu_cache_locations_list = []
         self.lxu_cache_locations_empty = torch.empty(
             0, device=self.current_device, dtype=torch.int32
-        ).fill_(-1)
+        )
         self.lxu_cache_locations = self.lxu_cache_locations_empty
         self.prefetch_stream: Optional[torch.cuda.Stream] = None
         self.linear_cache_indices_list = []
@@ -1582,40 +2069,26 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         self._init_uvm_cache_stats()
 
         # NOTE: no cache for CPU mode!
-        if cache_state.total_cache_hash_size == 0 or self.use_cpu:
+        if total_cache_hash_size == 0 or self.use_cpu:
             self.register_buffer(
                 "lxu_cache_weights",
                 torch.zeros(0, 0, device=self.current_device, dtype=dtype),
             )
             # NOTE: make TorchScript work!
-            self.register_buffer(
+            # Without a cache these placeholders are never read nor written,
+            # so they all share a single tensor
+            placeholder = torch.zeros(1, dtype=torch.int64, device=self.current_device)
+            for name in (
                 "cache_hash_size_cumsum",
-                torch.zeros(1, dtype=torch.int64, device=self.current_device),
-                persistent=False,
-            )
-            self.register_buffer(
                 "total_cache_hash_size",
-                torch.zeros(1, dtype=torch.int64, device=self.current_device),
-                persistent=False,
-            )
-            self.register_buffer(
                 "cache_index_table_map",
-                torch.zeros(1, dtype=torch.int64, device=self.current_device),
-                persistent=False,
-            )
-            self.register_buffer(
                 "lxu_cache_state",
-                torch.zeros(1, dtype=torch.int64, device=self.current_device),
-                persistent=False,
-            )
-            self.register_buffer(
                 "lxu_state",
-                torch.zeros(1, dtype=torch.int64, device=self.current_device),
-                persistent=False,
-            )
+            ):
+                self.register_buffer(name, placeholder, persistent=False)
             self.register_buffer(
                 "cache_miss_counter",
-                torch.tensor([0, 0], dtype=torch.int64),
+                torch.zeros(2, dtype=torch.int64),
                 persistent=False,
             )
             self._init_uvm_cache_counter(cache_sets, persistent=False)
@@ -1624,30 +2097,32 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         assert cache_load_factor > 0
         element_size = 2 if dtype == torch.float16 else 4
         if cache_sets <= 0:
-            total_memory = torch.cuda.get_device_properties(
-                self.current_device
-            ).total_memory
+            total_memory = _device_total_memory(
+                self.current_device.index
+                if self.current_device.index is not None
+                else torch.cuda.current_device()
+            )
             free_memory = (
                 total_memory
                 - torch.cuda.memory_reserved(self.current_device)
                 - int(cache_reserved_memory)
             )
             assert free_memory > 0
-            cache_sets = (
-                int(cache_state.total_cache_hash_size * cache_load_factor)
-                + DEFAULT_ASSOC
-                - 1
-            ) // DEFAULT_ASSOC
-            cache_sets = 1 if cache_sets == 0 else cache_sets
-            cache_size = cache_sets * DEFAULT_ASSOC * element_size * self.max_D_cache
-            if cache_size > free_memory:
-                cache_sets = (
-                    int(1.0 * free_memory / self.max_D_cache / element_size)
-                    + DEFAULT_ASSOC
-                    - 1
-                ) // DEFAULT_ASSOC
+            # Size the cache by the load factor, capped by the rows that fit in
+            # the free memory, and never below a single set
+            free_rows = free_memory // (self.max_D_cache * element_size)
+            cache_sets = max(
+                1,
+                min(
+                    div_round_up(
+                        int(total_cache_hash_size * cache_load_factor),
+                        DEFAULT_ASSOC,
+                    ),
+                    div_round_up(free_rows, DEFAULT_ASSOC),
+                ),
+            )
         cache_load_factor = (
-            1.0 * cache_sets * DEFAULT_ASSOC / int(cache_state.total_cache_hash_size)
+            1.0 * cache_sets * DEFAULT_ASSOC / int(total_cache_hash_size)
         )
         assert cache_sets > 0
         if cache_algorithm == CacheAlgorithm.LFU:
@@ -1660,52 +2135,52 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
             f"{cache_size / 1024.0 / 1024.0 / 1024.0 : .2f}GB"
         )
 
-        self.total_cache_hash_size = cache_state.total_cache_hash_size
-        self.register_buffer(
-            "cache_hash_size_cumsum",
-            torch.tensor(
-                cache_state.cache_hash_size_cumsum,
-                device=self.current_device,
-                dtype=torch.int64,
-            ),
-        )
-        self.register_buffer(
-            "cache_index_table_map",
-            torch.tensor(
-                cache_state.cache_index_table_map,
-                device=self.current_device,
-                dtype=torch.int32,
-            ),
-        )
-        self.register_buffer(
-            "lxu_cache_state",
-            torch.zeros(
-                cache_sets, DEFAULT_ASSOC, device=self.current_device, dtype=torch.int64
-            ).fill_(-1),
-        )
-        self.register_buffer(
-            "lxu_cache_weights",
-            torch.zeros(
-                cache_sets * DEFAULT_ASSOC,
-                self.max_D_cache,
-                device=self.current_device,
-                dtype=dtype,
-            ),
-        )
-        self.register_buffer(
-            "lxu_state",
-            torch.zeros(
-                size=(self.total_cache_hash_size + 1,)
-                if cache_algorithm == CacheAlgorithm.LFU
-                else (cache_sets, DEFAULT_ASSOC),
-                device=self.current_device,
-                dtype=torch.int64,
-            ),
-        )
-        self.register_buffer(
-            "cache_miss_counter",
-            torch.tensor([0, 0], device=self.current_device, dtype=torch.int64),
-        )
+        self.total_cache_hash_size = total_cache_hash_size
+        self.register_buffer("cache_hash_size_cumsum", cache_hash_size_cumsum)
+        self.register_buffer("cache_index_table_map", cache_index_table_map)
+        with self._cache_buffers_allocation(cache_mem_pool):
+            self.register_buffer(
+                "lxu_cache_state",
+                torch.full(
+                    (cache_sets, DEFAULT_ASSOC),
+                    -1,
+                    device=self.current_device,
+                    dtype=torch.int64,
+                ),
+            )
+            self.register_buffer(
+                "lxu_cache_weights",
+                torch.zeros(
+                    cache_sets * DEFAULT_ASSOC,
+                    self.max_D_cache,
+                    device=self.current_device,
+                    dtype=dtype,
+                ),
+            )
+            if cache_algorithm == CacheAlgorithm.LFU and managed_lxu_state:
+                # The LFU counters are indexed by linear cache index and can exceed
+                # HBM; back them with host-preferred managed memory instead
+                lxu_state_size = self.total_cache_hash_size + 1
+                lxu_state = torch.zeros(
+                    lxu_state_size,
+                    out=torch.ops.fbgemm.new_managed_tensor(
+                        torch.zeros(1, device=self.current_device, dtype=torch.int64),
+                        [lxu_state_size],
+                    ),
+                )
+            else:
+                lxu_state = torch.zeros(
+                    size=(self.total_cache_hash_size + 1,)
+                    if cache_algorithm == CacheAlgorithm.LFU
+                    else (cache_sets, DEFAULT_ASSOC),
+                    device=self.current_device,
+                    dtype=torch.int64,
+                )
+            self.register_buffer("lxu_state", lxu_state)
+            self.register_buffer(
+                "cache_miss_counter",
+                torch.zeros(2, device=self.current_device, dtype=torch.int64),
+            )
         self._init_uvm_cache_counter(cache_sets, persistent=True)
         if self.prefetch_pipeline:
             # using the placeholder_autograd_tensor to make sure
@@ -1828,13 +2303,12 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         if not self.gather_uvm_cache_stats:
             # If uvm_cache_stats is not enabled, register stub entries via buffer to state_dict for TorchScript to JIT properly.
             # Since we're not using these variables, we can choose minimize tensor size to keep state_dict size small.
+            # uvm_cache_stats is never passed to an op, so keep its stub on CPU
+            # to skip a device allocation; local_uvm_cache_stats is passed to
+            # the cache ops, which require it on the same device.
             self.register_buffer(
                 "uvm_cache_stats",
-                torch.zeros(
-                    1,
-                    device=self.current_device,
-                    dtype=torch.int64,
-                ),
+                torch.zeros(1, dtype=torch.int64),
                 persistent=False,
             )
             self.register_buffer(
@@ -1869,7 +2343,13 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
         if not self.lxu_cache_weights.numel():
             return
         self.lxu_cache_state.fill_(-1)
-        self.lxu_state.fill_(0)
+        if self.keep_lfu_history:
+            # LFU counters are indexed by linear cache index rather than by
+            # cache slot, so they stay meaningful once the cache is emptied;
+            # age them instead of dropping them
+            self.lxu_state.div_(2, rounding_mode="floor")
+        else:
+            self.lxu_state.fill_(0)
         self.timestep = 1
 
     def reset_embedding_weight_momentum(
@@ -1894,6 +2374,15 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
             OptimType.EXACT_ROWWISE_WEIGHTED_ADAGRAD,
         ]
         if rowwise:
+            (
+                pruned_indices,
+                pruned_indices_offsets,
+                logical_table_ids,
+                buffer_ids,
+            ) = batched_to_device_helper(
+                [pruned_indices, pruned_indices_offsets, logical_table_ids, buffer_ids],
+                self.current_device,
+            )
             torch.ops.fbgemm.reset_weight_momentum(
                 dev_weights=self.weights_dev,
                 uvm_weights=self.weights_uvm,
@@ -1905,12 +2394,10 @@ class SplitTableBatchedEmbeddingBagsCodegen(nn.Module):
                 momentum1_placements=self.momentum1_placements,
                 momentum1_offsets=self.momentum1_offsets,
                 D_offsets=self.D_offsets,
-                pruned_indices=pruned_indices.to(device=self.current_device),
-                pruned_indices_offsets=pruned_indices_offsets.to(
-                    device=self.current_device
-                ),
-                logical_table_ids=logical_table_ids.to(device=self.current_device),
-                buffer_ids=buffer_ids.to(device=self.current_device),
+                pruned_indices=pruned_indices,
+                pruned_indices_offsets=pruned_indices_offsets,
+                logical_table_ids=logical_table_ids,
+                buffer_ids=buffer_ids,
                 cache_hash_size_cumsum=self.cache_hash_size_cumsum,
                 lxu_cache_state=self.lxu_cache_state,
                 total_cache_hash_size=total_cache_hash_size,
@@ -1971,31 +2458,35 @@ class DenseTableBatchedEmbeddingBagsCodegen(nn.Module):
         )
         T = len(feature_table_map)
         assert T_ <= T
-        D_offsets = [dims[t] for t in feature_table_map]
-        D_offsets = [0] + list(accumulate(D_offsets))
-        self.total_D = D_offsets[-1]
+        # Build the per-feature metadata with vectorized CPU tensor ops rather
+        # than Python lists
+        feature_table_map_t = torch.tensor(feature_table_map, dtype=torch.int64)
+        D_offsets = torch.zeros(T + 1, dtype=torch.int64)
+        torch.cumsum(
+            torch.tensor(dims, dtype=torch.int64).index_select(0, feature_table_map_t),
+            dim=0,
+            out=D_offsets[1:],
+        )
+        self.total_D = int(D_offsets[-1])
         self.max_D = max(dims)
         self.register_buffer(
             "D_offsets",
-            torch.tensor(D_offsets, device=self.current_device, dtype=torch.int32),
+            D_offsets.to(device=self.current_device, dtype=torch.int32),
         )
         assert self.D_offsets.numel() == T + 1
 
-        hash_size_cumsum = [0] + list(accumulate(rows))
-        if hash_size_cumsum[-1] == 0:
-            self.total_hash_size_bits: int = 0
-        else:
-            self.total_hash_size_bits: int = int(log2(float(hash_size_cumsum[-1])) + 1)
+        rows_cumsum = torch.zeros(T_ + 1, dtype=torch.int64)
+        torch.cumsum(torch.tensor(rows, dtype=torch.int64), dim=0, out=rows_cumsum[1:])
+        # Exact integer equivalent of int(log2(total_hash_size) + 1) (0 for an
+        # empty hash space)
+        self.total_hash_size_bits: int = int(rows_cumsum[-1]).bit_length()
         # The last element is to easily access # of rows of each table by
         # hash_size_cumsum[t + 1] - hash_size_cumsum[t]
-        hash_size_cumsum = [hash_size_cumsum[t] for t in feature_table_map] + [
-            hash_size_cumsum[-1]
-        ]
+        hash_size_cumsum = torch.cat(
+            [rows_cumsum.index_select(0, feature_table_map_t), rows_cumsum[-1:]]
+        )
         self.register_buffer(
-            "hash_size_cumsum",
-            torch.tensor(
-                hash_size_cumsum, device=self.current_device, dtype=torch.int64
-            ),
+            "hash_size_cumsum", hash_size_cumsum.to(self.current_device)
         )
         weights_offsets = [0] + list(
             accumulate([row * dim for (row, dim) in embedding_specs])
@@ -2010,28 +2501,19 @@ class DenseTableBatchedEmbeddingBagsCodegen(nn.Module):
         for feature in range(T):
             t = feature_table_map[feature]
             row, dim = embedding_specs[t]
-            if (
-                self.weights[weights_offsets[t] : weights_offsets[t + 1]].numel()
-                != row * dim
-            ):
-                logging.info(
-                    f"row {row} dim {dim} feature {feature} t {t} {self.weights[weights_offsets[t] : weights_offsets[t + 1]].numel()}"
-                )
-            assert (
-                self.weights[weights_offsets[t] : weights_offsets[t + 1]].numel()
-                == row * dim
-            )
-            assert self.hash_size_cumsum[feature] == sum(
-                row for (row, _) in embedding_specs[:t]
-            )
+            # Check the table sizes from the offsets directly instead of
+            # slicing self.weights for every feature
+            numel = weights_offsets[t + 1] - weights_offsets[t]
+            if numel != row * dim:
+                logging.info(f"row {row} dim {dim} feature {feature} t {t} {numel}")
+            assert numel == row * dim
 
         self.weights_physical_offsets: List[int] = weights_offsets
-        weights_offsets = [weights_offsets[t] for t in feature_table_map]
         self.register_buffer(
             "weights_offsets",
-            torch.tensor(
-                weights_offsets, device=self.current_device, dtype=torch.int64
-            ),
+            torch.tensor(weights_offsets, dtype=torch.int64)
+            .index_select(0, feature_table_map_t)
+            .to(self.current_device),
         )
 
     def forward(
@@ -2067,11 +2549,12 @@ class DenseTableBatchedEmbeddingBagsCodegen(nn.Module):
         for t, (rows, dim) in enumerate(self.embedding_specs):
             offset = self.weights_physical_offsets[t]
             splits.append(
-                self.weights.detach()[offset : offset + rows * dim].view(rows, dim)
+                self.weights.detach().as_strided(
+                    (rows, dim), (dim, 1), self.weights.storage_offset() + offset
+                )
             )
         return splits
 
     def init_embedding_weights_uniform(self, min_val: float, max_val: float) -> None:
-        splits = self.split_embedding_weights()
-        for param in splits:
-            param.uniform_(min_val, max_val)
+        # All tables are views of self.weights, so fill it with a single kernel
+        self.weights.detach().uniform_(min_val, max_val)
@@ -42,6 +42,7 @@ from fbgemm_gpu.split_embedding_utils import (
 from fbgemm_gpu.split_table_batched_embeddings_ops_common import (
     BoundsCheckMode,
     CacheAlgorithm,
+    construct_cache_state,
     EmbeddingLocation,
     PoolingMode,
     RecordCacheMetrics,
@@ -51,7 +52,10 @@ from fbgemm_gpu.split_table_batched_embeddings_ops_inference import (
     rounded_row_size_in_bytes,
 )
 from fbgemm_gpu.split_table_batched_embeddings_ops_training import (
+    batched_to_device_helper,
     ComputeDevice,
+    construct_cache_state_tensors,
+    construct_split_state,
     CounterBasedRegularizationDefinition,
     CounterWeightDecayMode,
     DEFAULT_ASSOC,
@@ -5369,6 +5373,260 @@ class SplitTableBatchedEmbeddingsTest(unittest.TestCase):
             self.assertEqual(n_conflict_unique_misses, 0)
             self.assertEqual(n_conflict_misses, 0)
 
+    @unittest.skipIf(*gpu_unavailable)
+    def test_stb_uvm_cache_stats_with_cache_metrics(self) -> None:
+        D = 8
+        T = 2
+        E = 10**3
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=[
+                (E, D, EmbeddingLocation.MANAGED_CACHING, ComputeDevice.CUDA)
+                for _ in range(T)
+            ],
+            record_cache_metrics=RecordCacheMetrics(True, True),
+            gather_uvm_cache_stats=True,
+        )
+
+        x = torch.Tensor([[[1], [1]], [[3], [4]]])
+        x = to_device(torch.tensor(x, dtype=torch.int64), use_cpu=False)
+        indices, offsets = get_table_batched_offsets_from_dense(x, use_cpu=False)
+        cc.reset_cache_states()
+        cc.reset_uvm_cache_stats()
+        cc(indices, offsets)
+        (
+            n_calls,
+            n_requested_indices,
+            n_unique_indices,
+            n_unique_misses,
+            n_conflict_unique_misses,
+            n_conflict_misses,
+        ) = cc.get_uvm_cache_stats()
+        # The pre-populate lookup that records the cache miss metrics must not
+        # count the compulsory misses as conflict misses
+        self.assertEqual(n_calls, 1)
+        self.assertEqual(n_requested_indices, len(indices))
+        self.assertEqual(n_unique_indices, len(set(indices.tolist())))
+        self.assertEqual(n_unique_misses, len(set(indices.tolist())))
+        self.assertEqual(n_conflict_unique_misses, 0)
+        self.assertEqual(n_conflict_misses, 0)
+        # The cache miss metrics still see the compulsory misses
+        cache_miss_forward_count, unique_cache_miss_count = (
+            cc.get_cache_miss_counter().cpu()
+        )
+        self.assertEqual(cache_miss_forward_count, 1)
+        self.assertEqual(unique_cache_miss_count, len(set(indices.tolist())))
+
+    @unittest.skipIf(*gpu_unavailable)
+    @given(
+        T=st.integers(min_value=1, max_value=4),
+        B=st.integers(min_value=1, max_value=8),
+        offset_start=st.integers(min_value=0, max_value=5),
+    )
+    @settings(verbosity=Verbosity.verbose, max_examples=MAX_EXAMPLES, deadline=None)
+    def test_update_tablewise_cache_miss(
+        self, T: int, B: int, offset_start: int
+    ) -> None:
+        E = 100
+        D = 8
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=[
+                (E, D, EmbeddingLocation.MANAGED_CACHING, ComputeDevice.CUDA)
+                for _ in range(T)
+            ],
+            record_cache_metrics=RecordCacheMetrics(False, True),
+        )
+        lengths = torch.randint(0, 4, (T * B,))
+        offsets = torch.cat(
+            [torch.zeros(1, dtype=torch.int64), torch.cumsum(lengths, 0)]
+        )
+        # The indices of the batch start at offsets[0], which may be non-zero
+        offsets += offset_start
+        num_indices = int(offsets[-1])
+        linear_cache_indices = torch.randint(0, 10, (num_indices,))
+        lxu_cache_locations = torch.where(
+            torch.rand(num_indices) < 0.5, -1, torch.randint(0, 10, (num_indices,))
+        )
+
+        # Reference: per-table loop
+        expected = torch.zeros(T, dtype=torch.int64)
+        cache_missed_locations = torch.where(
+            lxu_cache_locations == -1, linear_cache_indices, -2
+        )
+        for t in range(T):
+            start = offsets[t * B]
+            end = offsets[(t + 1) * B]
+            unique_ids = torch.unique(cache_missed_locations[start:end])
+            expected[t] += torch.sum(torch.where(unique_ids == -2, 0, 1))
+
+        cc._update_tablewise_cache_miss(
+            lxu_cache_locations.cuda(),
+            linear_cache_indices.cuda(),
+            offsets.cuda(),
+        )
+        torch.testing.assert_close(cc.get_table_wise_cache_miss().cpu(), expected)
+
+    @unittest.skipIf(*gpu_unavailable)
+    def test_rowwise_adagrad_max_counter_async_refresh(self) -> None:
+        T = 2
+        E = 1000
+        D = 8
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=[
+                (E, D, EmbeddingLocation.DEVICE, ComputeDevice.CUDA)
+                for _ in range(T)
+            ],
+            optimizer=OptimType.EXACT_ROWWISE_ADAGRAD,
+            weight_decay_mode=WeightDecayMode.COUNTER,
+            counter_based_regularization=CounterBasedRegularizationDefinition(
+                counter_weight_decay_mode=CounterWeightDecayMode.DECOUPLE,
+            ),
+        )
+        row_counter = cc.row_counter_dev.detach()
+        row_counter.copy_(torch.rand_like(row_counter) * 100)
+
+        def sync_max_counter() -> float:
+            # Same value as the blocking _refresh_max_counter()
+            return float(torch.max(row_counter).item()) + 1.0
+
+        # The first refresh is synchronous
+        cc._refresh_max_counter_async()
+        self.assertEqual(cc._max_counter_py, sync_max_counter())
+
+        for _ in range(3):
+            expected = sync_max_counter()
+            # The async reduction is ordered before later updates of
+            # row_counter on the current stream
+            row_counter.add_(10)
+            torch.cuda.synchronize()
+            cc._refresh_max_counter_async()
+            # max_counter lags by one refresh period
+            self.assertEqual(cc._max_counter_py, expected)
+            self.assertAlmostEqual(cc.max_counter.item(), expected, places=3)
+
+        # The refresh event is not part of the copied/pickled module state
+        for cc_copy in [copy.deepcopy(cc), pickle.loads(pickle.dumps(cc))]:
+            self.assertIsNone(cc_copy._max_counter_event)
+            cc_copy._refresh_max_counter_async()
+            self.assertEqual(
+                cc_copy._max_counter_py,
+                float(torch.max(cc_copy.row_counter_dev).item()) + 1.0,
+            )
+        self.assertIsNotNone(cc._max_counter_event)
+
+    @unittest.skipIf(*gpu_unavailable)
+    @unittest.skipIf(
+        not hasattr(torch.cuda, "MemPool"), "torch.cuda.MemPool is not available"
+    )
+    def test_stb_cache_mem_pool(self) -> None:
+        D = 8
+        T = 2
+        E = 10**3
+        embedding_specs = [
+            (E, D, EmbeddingLocation.MANAGED_CACHING, ComputeDevice.CUDA)
+            for _ in range(T)
+        ]
+        pool = torch.cuda.MemPool()
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=embedding_specs, cache_mem_pool=pool
+        )
+        cc_ref = SplitTableBatchedEmbeddingBagsCodegen(embedding_specs=embedding_specs)
+        for w, w_ref in zip(
+            cc.split_embedding_weights(), cc_ref.split_embedding_weights()
+        ):
+            w_ref.copy_(w)
+
+        # The cache buffers come from the caller's pool, which the module
+        # does not keep a reference to
+        if hasattr(pool, "snapshot"):
+            ptr = cc.lxu_cache_weights.data_ptr()
+            self.assertTrue(
+                any(
+                    seg["address"] <= ptr < seg["address"] + seg["total_size"]
+                    for seg in pool.snapshot()
+                )
+            )
+        cc = copy.deepcopy(cc)
+
+        x = torch.Tensor([[[1], [1]], [[3], [4]]])
+        x = to_device(torch.tensor(x, dtype=torch.int64), use_cpu=False)
+        indices, offsets = get_table_batched_offsets_from_dense(x, use_cpu=False)
+        torch.testing.assert_close(cc(indices, offsets), cc_ref(indices, offsets))
+
+    @unittest.skipIf(*gpu_unavailable)
+    @given(keep_lfu_history=st.booleans())
+    @settings(verbosity=Verbosity.verbose, max_examples=MAX_EXAMPLES, deadline=None)
+    def test_stb_lfu_history_on_reset(self, keep_lfu_history: bool) -> None:
+        D = 8
+        T = 2
+        E = 10**3
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=[
+                (
+                    E,
+                    D,
+                    EmbeddingLocation.MANAGED_CACHING,
+                    ComputeDevice.CUDA,
+                )
+                for _ in range(T)
+            ],
+            cache_algorithm=CacheAlgorithm.LFU,
+            keep_lfu_history=keep_lfu_history,
+        )
+
+        x = torch.Tensor([[[1], [1]], [[3], [4]]])
+        x = to_device(torch.tensor(x, dtype=torch.int64), use_cpu=False)
+        indices, offsets = get_table_batched_offsets_from_dense(x, use_cpu=False)
+        for _ in range(3):
+            cc(indices, offsets)
+        lxu_state = cc.lxu_state.clone()
+        self.assertGreater(int(lxu_state.sum()), 0)
+
+        cc.reset_cache_states()
+        self.assertTrue(torch.all(cc.lxu_cache_state == -1))
+        if keep_lfu_history:
+            torch.testing.assert_close(
+                cc.lxu_state, torch.div(lxu_state, 2, rounding_mode="floor")
+            )
+        else:
+            self.assertTrue(torch.all(cc.lxu_state == 0))
+
+    @unittest.skipIf(*gpu_unavailable)
+    def test_stb_lfu_managed_lxu_state(self) -> None:
+        D = 8
+        T = 2
+        E = 10**3
+        B = 16
+        L = 4
+        embedding_specs = [
+            (E, D, EmbeddingLocation.MANAGED_CACHING, ComputeDevice.CUDA)
+            for _ in range(T)
+        ]
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=embedding_specs,
+            cache_algorithm=CacheAlgorithm.LFU,
+            managed_lxu_state=True,
+        )
+        cc_ref = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=embedding_specs,
+            cache_algorithm=CacheAlgorithm.LFU,
+        )
+        for w, w_ref in zip(
+            cc.split_embedding_weights(), cc_ref.split_embedding_weights()
+        ):
+            w_ref.copy_(w)
+        self.assertEqual(cc.lxu_state.shape, cc_ref.lxu_state.shape)
+        self.assertEqual(cc.lxu_state.device, cc_ref.lxu_state.device)
+
+        for _ in range(3):
+            x = torch.randint(0, E, (T, B, L))
+            x = to_device(x, use_cpu=False)
+            indices, offsets = get_table_batched_offsets_from_dense(x, use_cpu=False)
+            cc.prefetch(indices, offsets)
+            cc_ref.prefetch(indices, offsets)
+            torch.testing.assert_close(cc(indices, offsets), cc_ref(indices, offsets))
+            torch.testing.assert_close(cc.lxu_state, cc_ref.lxu_state)
+            torch.testing.assert_close(cc.lxu_cache_state, cc_ref.lxu_cache_state)
+
     @unittest.skipIf(*gpu_unavailable)
     @given(
         L=st.integers(min_value=0, max_value=16),
@@ -5937,6 +6195,362 @@ class SplitTableBatchedEmbeddingsTest(unittest.TestCase):
                 max_B=max_B,
             )
 
+    def test_bounds_check_int32_inputs_not_modified(self) -> None:
+        T = 2
+        E = 10
+        D = 4
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=[
+                (E, D, EmbeddingLocation.HOST, ComputeDevice.CPU) for _ in range(T)
+            ],
+            bounds_check_mode=BoundsCheckMode.IGNORE,
+        )
+        indices = torch.tensor([1, E + 5, 2, 3], dtype=torch.int32)
+        offsets = torch.tensor([0, 1, 2, 3, 4], dtype=torch.int32)
+        indices_ref = indices.clone()
+        offsets_ref = offsets.clone()
+        output = cc(indices, offsets)
+        # The out-of-bounds index is zeroed on the widened copy only
+        torch.testing.assert_close(indices, indices_ref)
+        torch.testing.assert_close(offsets, offsets_ref)
+        torch.testing.assert_close(
+            output,
+            cc(
+                torch.tensor([1, 0, 2, 3], dtype=torch.int64),
+                offsets_ref.long(),
+            ),
+        )
+
+    def test_state_dict_index_tensors_not_shared(self) -> None:
+        T = 2
+        E = 100
+        D = 8
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=[
+                (E, D, EmbeddingLocation.HOST, ComputeDevice.CPU) for _ in range(T)
+            ],
+            optimizer=OptimType.EXACT_ROWWISE_ADAGRAD,
+            weight_decay_mode=WeightDecayMode.COUNTER,
+            counter_based_regularization=CounterBasedRegularizationDefinition(
+                counter_weight_decay_mode=CounterWeightDecayMode.DECOUPLE,
+            ),
+        )
+        state_dict = cc.state_dict()
+        index_tensors = {
+            name: t
+            for name, t in state_dict.items()
+            if name.endswith("_offsets") or name.endswith("_placements")
+        }
+        self.assertIn("prev_iter_offsets", index_tensors)
+        # Identical splits (momentum1, prev_iter and row_counter) still get
+        # their own persistent tensors
+        data_ptrs = [t.untyped_storage().data_ptr() for t in index_tensors.values()]
+        self.assertEqual(len(set(data_ptrs)), len(data_ptrs))
+        torch.testing.assert_close(
+            state_dict["prev_iter_offsets"], state_dict["momentum1_offsets"]
+        )
+        torch.testing.assert_close(
+            state_dict["row_counter_placements"], state_dict["momentum1_placements"]
+        )
+
+    def test_get_states_returns_copies(self) -> None:
+        T = 2
+        E = 100
+        D = 8
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=[
+                (E, D, EmbeddingLocation.HOST, ComputeDevice.CPU) for _ in range(T)
+            ],
+            optimizer=OptimType.EXACT_ROWWISE_ADAGRAD,
+        )
+        _, _, _, placements, offsets = cc.get_states("weights")
+        placements_ref = placements.clone()
+        offsets_ref = offsets.clone()
+        placements.fill_(-1)
+        offsets.fill_(-1)
+        _, _, _, placements, offsets = cc.get_states("weights")
+        torch.testing.assert_close(placements, placements_ref)
+        torch.testing.assert_close(offsets, offsets_ref)
+
+    def test_split_views_cache(self) -> None:
+        T = 3
+        E = 100
+        D = 8
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=[
+                (E, D, EmbeddingLocation.HOST, ComputeDevice.CPU) for _ in range(T)
+            ],
+            optimizer=OptimType.EXACT_ROWWISE_ADAGRAD,
+        )
+
+        # Repeated calls hand out the cached views
+        weights = cc.split_embedding_weights()
+        states = cc.split_optimizer_states()
+        for w, w_ in zip(weights, cc.split_embedding_weights()):
+            self.assertEqual(w.data_ptr(), w_.data_ptr())
+        for s, s_ in zip(states, cc.split_optimizer_states()):
+            self.assertEqual(s[0].data_ptr(), s_[0].data_ptr())
+
+        # Replacing the buffers drops the cache, and the rebuilt views point
+        # at the new storages
+        cc.share_memory()
+        self.assertIsNone(cc._split_weights_cache)
+        self.assertIsNone(cc._split_optimizer_states_cache)
+        for w in cc.split_embedding_weights():
+            self.assertEqual(
+                w.untyped_storage().data_ptr(),
+                cc.weights_host.untyped_storage().data_ptr(),
+            )
+        for s in cc.split_optimizer_states():
+            self.assertEqual(
+                s[0].untyped_storage().data_ptr(),
+                cc.momentum1_host.untyped_storage().data_ptr(),
+            )
+
+        # So does loading a checkpoint, which may assign new buffers
+        cc.split_embedding_weights()
+        cc.split_optimizer_states()
+        cc.load_state_dict(copy.deepcopy(cc.state_dict()), assign=True)
+        self.assertIsNone(cc._split_weights_cache)
+        self.assertIsNone(cc._split_optimizer_states_cache)
+        for w in cc.split_embedding_weights():
+            self.assertEqual(
+                w.untyped_storage().data_ptr(),
+                cc.weights_host.untyped_storage().data_ptr(),
+            )
+
+        # NOTE: test TorchScript-compatible!
+        scripted = torch.jit.script(cc)
+        for _ in range(2):
+            for w, w_ in zip(
+                cc.split_embedding_weights(), scripted.split_embedding_weights()
+            ):
+                torch.testing.assert_close(w, w_)
+            for s, s_ in zip(
+                cc.split_optimizer_states(), scripted.split_optimizer_states()
+            ):
+                torch.testing.assert_close(s[0], s_[0])
+        self.assertEqual(len(scripted.get_optimizer_state()), T)
+
+    @unittest.skipIf(*gpu_unavailable)
+    def test_optimizer_states_state_dict_round_trip(self) -> None:
+        T = 3
+        E = 100
+        D = 8
+        embedding_specs = [
+            (E, D, EmbeddingLocation.MANAGED, ComputeDevice.CUDA) for _ in range(T)
+        ]
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=embedding_specs, optimizer=OptimType.EXACT_ADAM
+        )
+        for states in cc.split_optimizer_states():
+            for s in states:
+                s.copy_(torch.rand_like(s))
+
+        # Each UVM optimizer state owns its storage, so saving one of them
+        # does not drag the others along
+        for prefix in ["momentum1", "momentum2"]:
+            uvm = getattr(cc, f"{prefix}_uvm")
+            self.assertEqual(
+                uvm.untyped_storage().nbytes(), uvm.numel() * uvm.element_size()
+            )
+
+        cc_ref = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=embedding_specs, optimizer=OptimType.EXACT_ADAM
+        )
+        cc_ref.load_state_dict(cc.state_dict())
+        for states, states_ref in zip(
+            cc.split_optimizer_states(), cc_ref.split_optimizer_states()
+        ):
+            for s, s_ref in zip(states, states_ref):
+                torch.testing.assert_close(s, s_ref)
+                self.assertNotEqual(s.data_ptr(), s_ref.data_ptr())
+        for w, w_ref in zip(
+            cc.split_embedding_weights(), cc_ref.split_embedding_weights()
+        ):
+            torch.testing.assert_close(w, w_ref)
+
+    @unittest.skipIf(*gpu_unavailable)
+    def test_load_state_dict_refreshes_optimizer_args(self) -> None:
+        T = 2
+        E = 100
+        D = 8
+        embedding_specs = [
+            (E, D, EmbeddingLocation.DEVICE, ComputeDevice.CUDA) for _ in range(T)
+        ]
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=embedding_specs, optimizer=OptimType.ADAM
+        )
+        cc.set_optimizer_step(5)
+        cc_ref = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=embedding_specs, optimizer=OptimType.ADAM
+        )
+        cc_ref.load_state_dict(cc.state_dict(), assign=True)
+        self.assertEqual(int(cc_ref.iter[0]), 5)
+        # In-place writes to iter (e.g., from an in-place checkpoint load) are
+        # picked up by the next step
+        cc_ref.iter.copy_(torch.tensor([9]))
+        self.assertEqual(cc_ref._increment_iter(), 10)
+        # The Momentum args point at the assigned buffers
+        self.assertIs(cc_ref._momentum1_args().dev, cc_ref.momentum1_dev)
+        self.assertIs(cc_ref._momentum2_args().dev, cc_ref.momentum2_dev)
+
+        cc = SplitTableBatchedEmbeddingBagsCodegen(
+            embedding_specs=embedding_specs,
+            optimizer=OptimType.EXACT_ROWWISE_ADAGRAD,
+            weight_decay_mode=WeightDecayMode.COUNTER,
+            counter_based_regularization=CounterBasedRegularizationDefinition(
+                counter_weight_decay_mode=CounterWeightDecayMode.DECOUPLE,
+            ),
+        )
+        cc._refresh_max_counter_async()
+        self.assertIsNotNone(cc._max_counter_event)
+        state_dict = cc.state_dict()
+        state_dict["max_counter"] = torch.tensor([7.0])
+        cc.load_state_dict(state_dict)
+        # The in-flight refresh is dropped and the loaded value is used
+        self.assertIsNone(cc._max_counter_event)
+        self.assertEqual(cc._max_counter_py, 7.0)
+        self.assertIs(cc._row_counter_args().dev, cc.row_counter_dev)
+
+    @given(
+        T=st.integers(min_value=1, max_value=6),
+        use_cpu=st.booleans() if gpu_available else st.just(True),
+        data=st.data(),
+    )
+    @settings(verbosity=Verbosity.verbose, max_examples=MAX_EXAMPLES, deadline=None)
+    def test_construct_cache_state_tensors(
+        self, T: int, use_cpu: bool, data: st.DataObject
+    ) -> None:
+        rows = data.draw(st.lists(st.integers(0, 100), min_size=T, max_size=T))
+        locations = data.draw(
+            st.lists(
+                st.sampled_from(
+                    [EmbeddingLocation.DEVICE, EmbeddingLocation.MANAGED_CACHING]
+                ),
+                min_size=T,
+                max_size=T,
+            )
+        )
+        # Shared tables and tables without any feature
+        feature_table_map = data.draw(st.lists(st.integers(0, T - 1), min_size=1))
+        device = torch.device("cpu" if use_cpu else torch.cuda.current_device())
+
+        cache_state = construct_cache_state(rows, locations, feature_table_map)
+        cache_hash_size_cumsum, cache_index_table_map = construct_cache_state_tensors(
+            rows, locations, feature_table_map, device
+        )
+        self.assertEqual(cache_hash_size_cumsum.device, device)
+        self.assertEqual(cache_hash_size_cumsum.dtype, torch.int64)
+        self.assertEqual(cache_index_table_map.device, device)
+        self.assertEqual(cache_index_table_map.dtype, torch.int32)
+        self.assertEqual(
+            cache_hash_size_cumsum.tolist(), cache_state.cache_hash_size_cumsum
+        )
+        self.assertEqual(
+            cache_index_table_map.tolist(), cache_state.cache_index_table_map
+        )
+        self.assertEqual(
+            cache_index_table_map.numel(), cache_state.total_cache_hash_size
+        )
+
+    @given(
+        T=st.integers(min_value=1, max_value=10),
+        rowwise=st.booleans(),
+        cacheable=st.booleans(),
+        precision=st.sampled_from([SparseType.FP32, SparseType.INT8]),
+        placement=st.sampled_from([None] + list(EmbeddingLocation)),
+        data=st.data(),
+    )
+    @settings(verbosity=Verbosity.verbose, max_examples=MAX_EXAMPLES, deadline=None)
+    def test_construct_split_state(
+        self,
+        T: int,
+        rowwise: bool,
+        cacheable: bool,
+        precision: SparseType,
+        placement: Optional[EmbeddingLocation],
+        data: st.DataObject,
+    ) -> None:
+        embedding_specs = [
+            (
+                data.draw(st.integers(min_value=0, max_value=1000)),
+                4 * data.draw(st.integers(min_value=1, max_value=64)),
+                data.draw(st.sampled_from(list(EmbeddingLocation))),
+                ComputeDevice.CUDA,
+            )
+            for _ in range(T)
+        ]
+
+        # Reference: per-table loop
+        placements: List[EmbeddingLocation] = []
+        offsets: List[int] = []
+        dev_size = 0
+        host_size = 0
+        uvm_size = 0
+        for num_embeddings, embedding_dim, location, _ in embedding_specs:
+            if precision == SparseType.INT8:
+                embedding_dim += INT8_EMB_ROW_DIM_OFFSET
+            state_size = num_embeddings if rowwise else num_embeddings * embedding_dim
+            location = placement if placement is not None else location
+            if location == EmbeddingLocation.HOST:
+                placements.append(EmbeddingLocation.HOST)
+                offsets.append(host_size)
+                host_size += state_size
+            elif location == EmbeddingLocation.DEVICE or rowwise:
+                placements.append(EmbeddingLocation.DEVICE)
+                offsets.append(dev_size)
+                dev_size += state_size
+            else:
+                if cacheable and location == EmbeddingLocation.MANAGED_CACHING:
+                    placements.append(EmbeddingLocation.MANAGED_CACHING)
+                else:
+                    placements.append(EmbeddingLocation.MANAGED)
+                offsets.append(uvm_size)
+                uvm_size += state_size
+
+        split = construct_split_state(
+            embedding_specs,
+            rowwise=rowwise,
+            cacheable=cacheable,
+            precision=precision,
+            placement=placement,
+        )
+        self.assertEqual(split.placements, placements)
+        self.assertEqual(split.offsets, offsets)
+        self.assertEqual(split.dev_size, dev_size)
+        self.assertEqual(split.host_size, host_size)
+        self.assertEqual(split.uvm_size, uvm_size)
+
+    @unittest.skipIf(*gpu_unavailable)
+    def test_batched_to_device_helper(self) -> None:
+        current_device = torch.device(torch.cuda.current_device())
+        # Odd sizes so that the tensors do not naturally end on the alignment
+        tensors = [
+            torch.randint(-100, 100, (3,), dtype=torch.int32),
+            torch.randint(-100, 100, (5,), dtype=torch.int64),
+            torch.rand(2, 3, dtype=torch.float32),
+            torch.empty(0, dtype=torch.int32),
+            torch.randint(-100, 100, (7,), dtype=torch.int32),
+            torch.rand(1, dtype=torch.float64),
+        ]
+        for alignment in [8, 64]:
+            outputs = batched_to_device_helper(tensors, current_device, alignment)
+            self.assertEqual(len(outputs), len(tensors))
+            for t, out in zip(tensors, outputs):
+                self.assertEqual(out.device, current_device)
+                self.assertEqual(out.dtype, t.dtype)
+                self.assertEqual(out.shape, t.shape)
+                self.assertEqual(out.data_ptr() % alignment, 0)
+                torch.testing.assert_close(out.cpu(), t)
+
+        # Already on the device: plain copies
+        outputs = batched_to_device_helper(
+            [t.to(current_device) for t in tensors], current_device
+        )
+        for t, out in zip(tensors, outputs):
+            torch.testing.assert_close(out.cpu(), t)
+
     def test_pickle(self) -> None:
         tensor_queue = torch.classes.fbgemm.TensorQueue(torch.empty(0))
         pickled = pickle.dumps(tensor_queue)